@@ -0,0 +1,207 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mock_jira import MockJira, make_issue
+
+
+# ---------------------------------------------------------
+# OFFLINE BENCHMARK SUITE
+# ---------------------------------------------------------
+# Runs the scrapers against a local MockJira instead of issues.apache.org
+# and reports, per scenario, end-to-end issues/s, p50/p99 latency of the
+# scenario's phases (from METRICS) and peak RSS. Each scenario runs in a
+# fresh process, so peak RSS is that scenario's alone and the mock
+# server's work is not counted.
+#   rest       scrape_project over /search (+ /issue refetches), transform included
+#   transform  transform_issue over synthetic raw issues, no network
+#   html       HttpPool (issue_html.py) over the mock issue pages
+#   selenium   DriverPool (issue_data.py) over the same pages; needs Chrome
+# --out saves the results as a baseline; --baseline compares against one
+# and exits non-zero when a scenario got slower or bigger than TOLERANCE.
+
+SCENARIOS = ("rest", "transform", "html", "selenium")
+PHASES = {
+    "rest": ("search_page", "issue_fetch", "transform"),
+    "transform": ("transform",),
+    "html": ("html_fetch", "html_parse"),
+    "selenium": ("page_load", "extract_all_batched"),
+}
+PROJECT = "MOCK"
+TOLERANCE = 0.10   # allowed slowdown / memory growth against the baseline
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None if it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+# ---------------------------------------------------------
+# SCENARIOS (each runs in its own process)
+# ---------------------------------------------------------
+
+def _run_scenario(name, rest_url, browse_url, issues, workers, rate):
+    import scraper
+    from metrics import METRICS
+    from rate_limiter import LIMITER
+
+    scraper.BASE_URL = rest_url
+    LIMITER.rate = LIMITER.max_rate = rate
+    LIMITER.burst = max(LIMITER.burst, int(rate))
+
+    keys = [f"{PROJECT}-{n}" for n in range(1, issues + 1)]
+    METRICS.reset()
+    started = time.monotonic()
+
+    if name == "rest":
+        done = sum(1 for _ in scraper.scrape_project(PROJECT, limit=issues, workers=workers))
+
+    elif name == "transform":
+        raws = [make_issue(PROJECT, n) for n in range(1, issues + 1)]
+        started = time.monotonic()
+        for raw in raws:
+            with METRICS.timer("transform"):
+                scraper.transform_issue(raw)
+        done = len(raws)
+
+    else:
+        if name == "html":
+            from issue_html import HttpPool
+            pool = HttpPool(size=workers)
+        else:
+            from driver_pool import DriverPool
+            pool = DriverPool(size=min(workers, 4))
+
+        with pool:
+            pages = [(key, browse_url.format(key=key)) for key in keys]
+            done = sum(1 for _, _, error in pool.imap(pages) if error is None)
+
+    seconds = time.monotonic() - started
+    snap = METRICS.snapshot()
+    return {
+        "issues": done,
+        "seconds": round(seconds, 3),
+        "issues_per_s": round(done / seconds, 1) if seconds else 0.0,
+        "latency": {
+            phase: {k: snap["phases"][phase][k] for k in ("count", "p50_s", "p99_s")}
+            for phase in PHASES[name] if phase in snap["phases"]
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "counters": snap["counters"]
+    }
+
+
+def run_benchmarks(scenarios=("rest", "transform", "html"), issues=2000, workers=8,
+                   latency=0.02, throttle=0.0, rate=1000.0):
+    """Run `scenarios` against a fresh MockJira; returns {scenario: result}."""
+    results = {}
+    mock = MockJira({PROJECT: issues}, latency=latency, jitter=latency / 4, throttle=throttle,
+                    retry_after=0)
+    context = multiprocessing.get_context("spawn")
+
+    with mock:
+        browse_url = mock.url + "/jira/browse/{key}"
+        for name in scenarios:
+            print(f"\n▶ {name}: {issues} issues, {workers} workers, "
+                  f"{latency * 1000:.0f} ms latency, {throttle:.0%} throttled")
+            served = dict(mock.stats)
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    result = pool.submit(_run_scenario, name, mock.rest_url, browse_url,
+                                         issues, workers, rate).result()
+                except Exception as e:
+                    print(f"  skipped: {e!r}")
+                    results[name] = {"skipped": repr(e)}
+                    continue
+
+            result["server"] = {k: mock.stats[k] - served[k] for k in served}
+            results[name] = result
+            print(f"  {result['issues_per_s']} issues/s, peak RSS {result['peak_rss_mb']} MB")
+            for phase, lat in result["latency"].items():
+                print(f"  {phase:<20} p50 {lat['p50_s'] * 1000:8.2f} ms   p99 {lat['p99_s'] * 1000:8.2f} ms")
+
+    return results
+
+
+# ---------------------------------------------------------
+# BASELINE COMPARISON
+# ---------------------------------------------------------
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lines describing every regression of `results` against `baseline`."""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if not old or "skipped" in new or "skipped" in old:
+            continue
+
+        if new["issues_per_s"] < old["issues_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: {new['issues_per_s']} issues/s (baseline {old['issues_per_s']})")
+
+        if new["peak_rss_mb"] and old.get("peak_rss_mb") and \
+                new["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {new['peak_rss_mb']} MB (baseline {old['peak_rss_mb']})")
+
+        for phase, lat in new["latency"].items():
+            before = old.get("latency", {}).get(phase)
+            if before and lat["p99_s"] > before["p99_s"] * (1 + tolerance) + 0.001:
+                regressions.append(f"{name}/{phase}: p99 {lat['p99_s'] * 1000:.1f} ms "
+                                   f"(baseline {before['p99_s'] * 1000:.1f} ms)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local mock Jira")
+    parser.add_argument("--scenarios", default="rest,transform,html",
+                        help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--issues", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8, help="fetch threads / browsers")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock response delay, seconds")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fraction of responses that are 429")
+    parser.add_argument("--rate", type=float, default=1000.0, help="rate limiter budget, requests/s")
+    parser.add_argument("--out", help="save results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous --out file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(scenarios, issues=args.issues, workers=args.workers,
+                             latency=args.latency, throttle=args.throttle, rate=args.rate)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved → {args.out}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}")
+        with open(args.baseline, encoding="utf8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
@@ -0,0 +1,45 @@
+import json
+import os
+
+
+# ---------------------------------------------------------
+# CRAWL CHECKPOINTS
+# ---------------------------------------------------------
+# A checkpoint is a small JSON file next to the dataset that records how
+# far a crawl got: the pagination cursor, the keys already written and the
+# byte size of the output file at the moment those keys were flushed.
+# It is always replaced atomically, so a crash leaves either the previous
+# or the new checkpoint on disk, never a half-written one.
+
+def load_checkpoint(path):
+    """Return the saved checkpoint dict, or None when there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    """Atomically replace the checkpoint at `path` with `state`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def truncate_output(path, offset):
+    """
+    Cut `path` back to `offset` bytes.
+
+    Lines written after the last checkpoint are dropped so that a resumed
+    crawl does not append duplicates of issues it is about to redo.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as f:
+        f.truncate(offset)
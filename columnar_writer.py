@@ -0,0 +1,191 @@
+import json
+from datetime import datetime, timezone
+
+
+# ---------------------------------------------------------
+# PARQUET OUTPUT (OPTIONAL, NEEDS pyarrow)
+# ---------------------------------------------------------
+# ParquetWriter has the same write/flush/close interface as JsonlWriter.
+# Rows are buffered and written as one row group per `row_group_size`
+# issues, so memory stays bounded however large the project is. Nested
+# data (comments, issue links, Q&A) are list-of-struct columns; project,
+# status and created/updated are plain top-level columns so readers can
+# prune row groups with predicates on them.
+
+ROW_GROUP_SIZE = 5000
+COMPRESSION = "zstd"
+
+JIRA_TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M%z")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+    return pa, pq
+
+
+def parse_time(value):
+    """Jira timestamp string → aware UTC datetime, None if missing or unparseable."""
+    if not value:
+        return None
+    for fmt in JIRA_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).astimezone(timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+# ---------------------------------------------------------
+# SCHEMAS
+# ---------------------------------------------------------
+
+def rest_schema():
+    """Schema of the transformed REST dataset ({p}_dataset.jsonl)."""
+    pa, _ = _require_pyarrow()
+    ts = pa.timestamp("ms", tz="UTC")
+    return pa.schema([
+        ("id", pa.string()),
+        ("key", pa.string()),
+        ("project", pa.string()),
+        ("title", pa.string()),
+        ("status", pa.string()),
+        ("priority", pa.string()),
+        ("type", pa.string()),
+        ("reporter", pa.string()),
+        ("assignee", pa.string()),
+        ("labels", pa.list_(pa.string())),
+        ("created", ts),
+        ("updated", ts),
+        ("description", pa.string()),
+        ("comments", pa.list_(pa.struct([
+            ("author", pa.string()),
+            ("created", pa.string()),
+            ("body", pa.string()),
+        ]))),
+        ("derived", pa.struct([
+            ("summary", pa.string()),
+            ("classification", pa.struct([
+                ("priority", pa.string()),
+                ("type", pa.string()),
+                ("labels", pa.list_(pa.string())),
+            ])),
+            ("qna", pa.list_(pa.struct([
+                ("question", pa.string()),
+                ("answer", pa.string()),
+            ]))),
+        ])),
+    ])
+
+
+def rest_row(issue):
+    return {
+        **issue,
+        "created": parse_time(issue.get("created")),
+        "updated": parse_time(issue.get("updated")),
+    }
+
+
+def selenium_schema():
+    """Schema of the browser-extracted dataset (output/{project}.jsonl)."""
+    pa, _ = _require_pyarrow()
+    ts = pa.timestamp("ms", tz="UTC")
+
+    def strings(*names):
+        return pa.struct([(name, pa.string()) for name in names])
+
+    return pa.schema([
+        ("key", pa.string()),
+        ("project", pa.string()),
+        ("status", pa.string()),
+        ("type", pa.string()),
+        ("priority", pa.string()),
+        ("created", ts),
+        ("updated", ts),
+        ("summary", strings("issue_key", "issue_summary")),
+        ("metadata", strings("type", "status", "priority", "resolution", "affects_versions",
+                             "fix_versions", "labels", "environment")),
+        ("people", strings("assignee", "reporter", "votes", "watchers")),
+        ("dates", strings("created_display", "created_iso", "updated_display", "updated_iso")),
+        ("description", pa.string()),
+        ("issue_links", pa.list_(strings("type", "key", "url", "summary", "priority", "status"))),
+        ("comments", pa.list_(strings("author", "display_time", "iso_time", "text"))),
+    ])
+
+
+def selenium_row(obj):
+    key = (obj.get("summary") or {}).get("issue_key")
+    metadata = obj.get("metadata") or {}
+    dates = obj.get("dates") or {}
+    return {
+        **obj,
+        "key": key,
+        "project": key.rsplit("-", 1)[0] if key else None,
+        "status": metadata.get("status"),
+        "type": metadata.get("type"),
+        "priority": metadata.get("priority"),
+        "created": parse_time(dates.get("created_iso")),
+        "updated": parse_time(dates.get("updated_iso")),
+    }
+
+
+SCHEMAS = {
+    "rest": (rest_schema, rest_row),
+    "selenium": (selenium_schema, selenium_row),
+}
+
+
+# ---------------------------------------------------------
+# WRITER
+# ---------------------------------------------------------
+
+class ParquetWriter:
+    """Incremental Parquet writer for one of the SCHEMAS ("rest" or "selenium")."""
+
+    def __init__(self, path, kind="rest", row_group_size=ROW_GROUP_SIZE, compression=COMPRESSION):
+        pa, pq = _require_pyarrow()
+        make_schema, self._to_row = SCHEMAS[kind]
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self.count = 0
+        self._pa = pa
+        self._schema = make_schema()
+        self._rows = []
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+
+    def write(self, obj):
+        self._rows.append(self._to_row(obj))
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._rows.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def jsonl_to_parquet(jsonl_path, parquet_path, kind="rest", row_group_size=ROW_GROUP_SIZE):
+    """Stream a JSONL dataset into Parquet; returns the number of rows."""
+    with open(jsonl_path, encoding="utf8") as src, \
+            ParquetWriter(parquet_path, kind, row_group_size=row_group_size) as writer:
+        for line in src:
+            if line.strip():
+                writer.write(json.loads(line))
+    return writer.count
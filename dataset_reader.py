@@ -0,0 +1,284 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from json.decoder import scanstring
+
+
+# ---------------------------------------------------------
+# LAZY DATASET READER
+# ---------------------------------------------------------
+# Reads the JSONL files the scrapers write ({p}_dataset.jsonl,
+# output/{project}.jsonl) without parsing all of them up front:
+#   - the file is memory-mapped, so only the pages actually read are
+#     loaded, and the OS page cache is shared between processes
+#   - a sidecar "<path>.idx" keeps the byte offset and key of every line.
+#     It is built with one scan the first time; after that opening the
+#     dataset is three sequential reads, near instant even for multi-GB files.
+#     It records the dataset's size and mtime and is rebuilt when they change
+#   - reader[i], reader[i:j] and reader.get(key) return LazyIssue objects,
+#     which decode top-level fields one by one, only as far as the last
+#     field asked for (the flat fields come first, the comments last)
+#   - parallel_map() hands (start, stop) ranges to worker processes, which
+#     open their own mapping of the file, so records are never pickled to them
+
+INDEX_MAGIC = b"JSONLIX1"
+INDEX_HEADER = struct.Struct("<8sQQQ")   # magic, dataset size, mtime_ns, lines
+READ_CHUNK = 2000   # lines per parallel_map task
+
+# the first key of a line: "key" in the REST dataset, summary.issue_key
+# in the browser output
+_KEY = re.compile(rb'"(?:issue_)?key"\s*:\s*"([^"\\]*)"')
+_scan_once = json.JSONDecoder().scan_once
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+def _skip(text, pos):
+    return _WS.match(text, pos).end() if text[pos] in " \t\n\r" else pos
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+class LazyIssue:
+    """
+    One JSONL record whose top-level fields are decoded on first access.
+
+    Members are decoded in file order with json's C scanner and only up to
+    the requested one, so reading "key" or "status" stops long before the
+    comments.
+    """
+
+    def __init__(self, text):
+        self.raw = text
+        self._values = {}
+        self._pos = _skip(text, text.index("{") + 1)
+        self._done = False
+
+    def _next(self):
+        """Decode the next top-level member; False at the end of the object."""
+        text, pos = self.raw, self._pos
+        if self._done or text[pos] == "}":
+            self._done = True
+            return False
+        if text[pos] == ",":
+            pos = _skip(text, pos + 1)
+        name, pos = scanstring(text, pos + 1)
+        pos = _skip(text, text.index(":", pos) + 1)
+        try:
+            self._values[name], pos = _scan_once(text, pos)
+        except StopIteration:
+            raise json.JSONDecodeError("Expecting value", text, pos) from None
+        self._pos = _skip(text, pos)
+        return True
+
+    def __getitem__(self, name):
+        while name not in self._values:
+            if not self._next():
+                raise KeyError(name)
+        return self._values[name]
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return self.get(name, self) is not self
+
+    def pick(self, fields):
+        """Only `fields`, as a dict; missing ones are left out."""
+        return {name: self[name] for name in fields if name in self}
+
+    def to_dict(self):
+        while self._next():
+            pass
+        return dict(self._values)
+
+    def __repr__(self):
+        return f"LazyIssue({self.raw[:60]!r}...)"
+
+
+class DatasetReader:
+    """Random access to the lines of a JSONL dataset through mmap and a sidecar offset index."""
+
+    def __init__(self, path, build_index=True):
+        self.path = path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self._positions = None   # key → line number, built on the first get()
+
+        loaded = self._load_index(stat)
+        if loaded is None:
+            loaded = self._scan()
+            if build_index:
+                self._save_index(stat, *loaded)
+        self._offsets, self._keys = loaded
+
+    # --------------------------
+    # Sidecar index
+    # --------------------------
+    def _load_index(self, stat):
+        try:
+            with open(index_path(self.path), "rb") as f:
+                magic, size, mtime_ns, lines = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                    return None
+                offsets = array("Q")
+                offsets.frombytes(f.read(8 * (lines + 1)))
+                keys = f.read().decode("utf8").split("\n") if lines else []
+        except (OSError, struct.error, UnicodeDecodeError):
+            return None
+        if len(offsets) != lines + 1 or len(keys) != lines:
+            return None
+        return offsets, keys
+
+    def _scan(self):
+        """
+        Start offsets of the non-blank lines plus the file size, and their
+        keys. A record runs up to the next one's start; blank lines in
+        between are just trailing whitespace to the decoder.
+        """
+        offsets, keys = array("Q"), []
+        mm, pos, size = self._mm, 0, len(self._mm)
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            end = size if end == -1 else end + 1
+            line = mm[pos:end]
+            if line.strip():
+                match = _KEY.search(line)
+                offsets.append(pos)
+                keys.append(match.group(1).decode("utf8") if match else "")
+            pos = end
+        offsets.append(size)
+        return offsets, keys
+
+    def _save_index(self, stat, offsets, keys):
+        tmp = index_path(self.path) + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(keys)))
+                f.write(offsets.tobytes())
+                f.write("\n".join(keys).encode("utf8"))
+            os.replace(tmp, index_path(self.path))
+        except OSError:
+            pass   # read-only location: the index just stays in memory
+
+    # --------------------------
+    # Access
+    # --------------------------
+    def __len__(self):
+        return len(self._keys)
+
+    def line(self, i):
+        """The raw JSON text of record `i`."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._mm[self._offsets[i]:self._offsets[i + 1]].decode("utf8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [LazyIssue(self.line(n)) for n in range(*i.indices(len(self)))]
+        return LazyIssue(self.line(i))
+
+    def keys(self):
+        return list(self._keys)
+
+    def position(self, key):
+        """Line number of `key`, None if the dataset does not have it (last one wins)."""
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._keys)}
+        return self._positions.get(key)
+
+    def get(self, key):
+        i = self.position(key)
+        return None if i is None else self[i]
+
+    def iter(self, start=0, stop=None, fields=None):
+        """
+        Records start..stop as LazyIssues, or as dicts of only `fields`
+        when those are given.
+        """
+        for i in range(*slice(start, stop).indices(len(self))):
+            issue = LazyIssue(self.line(i))
+            yield issue.pick(fields) if fields else issue
+
+    def __iter__(self):
+        return self.iter()
+
+    def chunks(self, size=READ_CHUNK):
+        """(start, stop) ranges of `size` records covering the dataset."""
+        return [(start, min(start + size, len(self))) for start in range(0, len(self), size)]
+
+    def parallel_map(self, func, workers=None, chunk_size=READ_CHUNK, fields=None):
+        """
+        Yield func(record) for every record, in order, computed on a process
+        pool. `func` must be a top-level (picklable) function; it gets a
+        dict of `fields` if given, else the fully decoded record.
+        """
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            ranges = iter(self.chunks(chunk_size))
+            in_flight = deque()
+
+            def submit_next():
+                span = next(ranges, None)
+                if span is not None:
+                    in_flight.append(pool.submit(_map_chunk, self.path, *span, func, fields))
+
+            for _ in range(2 * workers):
+                submit_next()
+
+            while in_flight:
+                results = in_flight.popleft().result()
+                submit_next()
+                yield from results
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _map_chunk(path, start, stop, func, fields):
+    # the parent already built the sidecar index, so this open is cheap
+    with DatasetReader(path, build_index=False) as reader:
+        if fields:
+            return [func(issue) for issue in reader.iter(start, stop, fields)]
+        return [func(json.loads(reader.line(i))) for i in range(start, stop)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index a JSONL dataset and read records from it")
+    parser.add_argument("path", help="e.g. HADOOP_dataset.jsonl or output/ABDERA.jsonl")
+    parser.add_argument("keys", nargs="*", help="print these issues (default: just build the index)")
+    parser.add_argument("--fields", help="comma-separated top-level fields to print")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with DatasetReader(args.path) as reader:
+        print(f"{len(reader)} issues in {args.path}, opened in {(time.perf_counter() - started) * 1000:.1f} ms")
+        fields = [f for f in (args.fields or "").split(",") if f]
+        for key in args.keys:
+            issue = reader.get(key.upper())
+            if issue is None:
+                print(f"{key}: not in the dataset")
+            else:
+                print(json.dumps(issue.pick(fields) if fields else issue.to_dict(), ensure_ascii=False))
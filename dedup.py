@@ -0,0 +1,278 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from array import array
+
+from scraper import blob_parts, summarize
+from text_clean import text_head
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ---------------------------------------------------------
+# COMMENT DEDUPLICATION
+# ---------------------------------------------------------
+# A pass over a dataset ({p}_dataset.jsonl, or the browser scraper's
+# output/{project}.jsonl, whose comments keep their text under "text")
+# that drops comments already seen earlier in the project: bot reports
+# (Hadoop QA, build results), pasted logs, comments that repeat the
+# description.
+#   exact  lowercased, whitespace-collapsed text hashed with blake2b
+#   near   MinHash over word 3-shingles (digits folded to 0, so build
+#          numbers and timings do not matter), LSH with BANDS × ROWS;
+#          candidates sharing the most bands are checked first, and one
+#          counts as a duplicate when the estimated Jaccard similarity is
+#          at least NEAR_THRESHOLD and the new text is not longer than it
+#          by more than NEAR_LENGTH_RATIO (a reply quoting an earlier
+#          comment and adding to it is kept)
+# Texts under MIN_TOKENS words ("Thanks", "+1", "LGTM") are never dropped.
+# The first occurrence, in file order (created ASC), is kept.
+# Descriptions go into the same index, so a comment that repeats one is
+# dropped, but descriptions themselves are never removed.
+# The index lives in a temporary SQLite file next to the dataset. Memory
+# stays at SQLite's page cache (CACHE_KB) however many comments there are.
+# numpy, when installed, computes the signatures about 3x faster; both
+# paths give identical signatures.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+NEAR_THRESHOLD = 0.8
+NEAR_LENGTH_RATIO = 1.1   # a near duplicate may be at most this much longer (in words)
+MIN_TOKENS = 8   # shorter texts are kept and not indexed
+MAX_CANDIDATES = 8   # LSH candidates verified per text, most shared bands first
+CACHE_KB = 64 * 1024
+
+MASK64 = (1 << 64) - 1
+_rng = random.Random(20240601)
+PERMS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+if np is not None:
+    _PERM_A = np.array([a for a, _ in PERMS], dtype=np.uint64)[:, None]
+    _PERM_B = np.array([b for _, b in PERMS], dtype=np.uint64)[:, None]
+
+SCHEMA = """
+CREATE TABLE docs (id INTEGER PRIMARY KEY, sig BLOB, tokens INTEGER NOT NULL, snippet TEXT,
+                   hits INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE exact (hash INTEGER PRIMARY KEY, id INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE lsh (bucket INTEGER NOT NULL, id INTEGER NOT NULL);
+CREATE INDEX lsh_bucket ON lsh (bucket);
+"""
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _hash64(data, signed=False):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=signed)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _token_hash(token):
+    return _hash64(token.encode("utf8"))
+
+
+def minhash(tokens):
+    """NUM_PERM 32-bit MinHash values of the word 3-grams of `tokens` (at least 3)."""
+    th = [_token_hash(t) for t in tokens]
+    # a 3-gram's hash is mixed from its tokens' hashes, no string joining
+    hashes = list({(a * 0x9E3779B97F4A7C15 + b * 0xC2B2AE3D27D4EB4F + c) & MASK64
+                   for a, b, c in zip(th, th[1:], th[2:])})
+
+    if np is not None:
+        h = np.array(hashes, dtype=np.uint64)[None, :]
+        return ((_PERM_A * h + _PERM_B) >> np.uint64(32)).min(axis=1).tolist()   # wraps mod 2**64
+
+    return [min(((a * h + b) & MASK64) >> 32 for h in hashes) for a, b in PERMS]
+
+
+def band_buckets(sig):
+    # tuples of ints hash the same in every process, and fit SQLite's INTEGER
+    return [hash((band, *sig[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+def similarity(sig, other):
+    return sum(x == y for x, y in zip(sig, other)) / NUM_PERM
+
+
+class DedupIndex:
+    """Exact + MinHash/LSH index of the texts seen so far, in an SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -{CACHE_KB};
+        """)
+        self._db.executescript(SCHEMA)
+        self._next_id = 0
+
+    def check(self, text, keep=False):
+        """
+        Return None if `text` is new (and index it), "short" if it is too
+        short to judge, else "exact" or "near". With keep=True the text is
+        indexed even when it is a duplicate.
+        """
+        norm = " ".join(text.lower().split())
+        tokens = _DIGITS.sub("0", norm).split()
+        if len(tokens) < MIN_TOKENS:
+            return "short"
+
+        key = _hash64(norm.encode("utf8"), signed=True)
+        row = self._db.execute("SELECT id FROM exact WHERE hash = ?", (key,)).fetchone()
+        if row is not None:
+            self._hit(row[0])
+            return "exact"
+
+        sig = minhash(tokens)
+        buckets = band_buckets(sig)
+        marks = ",".join("?" * len(buckets))
+        candidates = self._db.execute(
+            f"SELECT d.id, d.sig, d.tokens FROM docs d JOIN ("
+            f"  SELECT id, COUNT(*) AS shared FROM lsh WHERE bucket IN ({marks})"
+            f"  GROUP BY id ORDER BY shared DESC, id LIMIT {MAX_CANDIDATES}"
+            f") c ON c.id = d.id ORDER BY c.shared DESC, d.id",
+            buckets
+        ).fetchall()
+        for doc_id, stored, stored_tokens in candidates:
+            if len(tokens) <= stored_tokens * NEAR_LENGTH_RATIO and \
+                    similarity(sig, array("I", stored)) >= NEAR_THRESHOLD:
+                self._hit(doc_id)
+                if keep:
+                    self._add(key, norm, sig, buckets, len(tokens))
+                return "near"
+
+        self._add(key, norm, sig, buckets, len(tokens))
+        return None
+
+    def _hit(self, doc_id):
+        self._db.execute("UPDATE docs SET hits = hits + 1 WHERE id = ?", (doc_id,))
+
+    def _add(self, key, norm, sig, buckets, tokens):
+        self._next_id += 1
+        doc_id = self._next_id
+        self._db.execute("INSERT INTO docs (id, sig, tokens, snippet) VALUES (?, ?, ?, ?)",
+                         (doc_id, array("I", sig).tobytes(), tokens, norm[:80]))
+        self._db.execute("INSERT OR IGNORE INTO exact VALUES (?, ?)", (key, doc_id))
+        self._db.executemany("INSERT INTO lsh VALUES (?, ?)", [(b, doc_id) for b in buckets])
+
+    def top_duplicates(self, n=5):
+        return self._db.execute(
+            "SELECT hits, snippet FROM docs WHERE hits > 0 ORDER BY hits DESC LIMIT ?", (n,)
+        ).fetchall()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+# ---------------------------------------------------------
+# DATASET PASS
+# ---------------------------------------------------------
+
+def comment_text(comment):
+    # "body" in the REST dataset, "text" in the browser scraper's output
+    return comment.get("body") or comment.get("text") or ""
+
+
+def dedup_issue(issue, index, stats):
+    """Drop the duplicate comments of one REST or browser record, in place."""
+    if issue.get("description"):
+        if index.check(issue["description"], keep=True) in ("exact", "near"):
+            stats["descriptions_duplicate"] += 1
+
+    kept = []
+    for comment in issue.get("comments") or []:
+        body = comment_text(comment)
+        stats["comments"] += 1
+        stats["bytes_in"] += len(body)
+
+        kind = index.check(body) if body else "short"
+        if kind == "short":
+            stats["too_short"] += 1
+        if kind in (None, "short"):
+            kept.append(comment)
+            continue
+        stats[f"removed_{kind}"] += 1
+        stats["bytes_removed"] += len(body)
+
+    if len(kept) != len(issue.get("comments") or []):
+        issue["comments"] = kept
+        if "derived" in issue:
+            issue["derived"]["summary"] = summarize(text_head(blob_parts(issue), 300))
+    return issue
+
+
+def dedup_file(path, out_path=None, top=5):
+    """
+    Remove duplicate comments from the JSONL dataset at `path` (in place
+    unless `out_path` is given). Returns the stats dict, also printed.
+    """
+    out_path = out_path or path
+    folder = os.path.dirname(os.path.abspath(out_path))
+    fd, index_path = tempfile.mkstemp(suffix=".dedup.sqlite", dir=folder)
+    os.close(fd)
+    tmp = out_path + ".tmp"
+
+    stats = {
+        "issues": 0, "comments": 0, "too_short": 0, "removed_exact": 0, "removed_near": 0,
+        "descriptions_duplicate": 0, "bytes_in": 0, "bytes_removed": 0
+    }
+    started = time.monotonic()
+    index = DedupIndex(index_path)
+    try:
+        with open(path, encoding="utf8") as src, open(tmp, "w", encoding="utf8") as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                issue = dedup_issue(json.loads(line), index, stats)
+                dst.write(json.dumps(issue, ensure_ascii=False) + "\n")
+                stats["issues"] += 1
+        stats["top"] = index.top_duplicates(top)
+    finally:
+        index.close()
+        os.remove(index_path)
+
+    os.replace(tmp, out_path)
+    stats["seconds"] = round(time.monotonic() - started, 1)
+    report(path, stats)
+    return stats
+
+
+def report(path, stats):
+    removed = stats["removed_exact"] + stats["removed_near"]
+    share = removed / stats["comments"] if stats["comments"] else 0.0
+    bytes_share = stats["bytes_removed"] / stats["bytes_in"] if stats["bytes_in"] else 0.0
+
+    print(f"Dedup {path}: {removed}/{stats['comments']} comments removed ({share:.1%}; "
+          f"{stats['removed_exact']} exact, {stats['removed_near']} near), "
+          f"{stats['bytes_removed'] / 1024 ** 2:.1f} MB of comment text ({bytes_share:.1%}, "
+          f"~{stats['bytes_removed'] // 4} tokens), "
+          f"{stats['descriptions_duplicate']} repeated descriptions kept, "
+          f"{stats['too_short']} comments too short to judge, in {stats['seconds']}s")
+    if stats["issues"] and not stats["comments"]:
+        print(f"  no comments found in {path}: nothing was deduplicated")
+    for hits, snippet in stats.get("top", []):
+        print(f"  {hits:>6} × {snippet}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove duplicate comments from a dataset JSONL")
+    parser.add_argument("paths", nargs="+", help="e.g. HADOOP_dataset.jsonl")
+    parser.add_argument("--out", help="write here instead of in place (single input only)")
+    args = parser.parse_args()
+
+    if args.out and len(args.paths) > 1:
+        parser.error("--out needs a single input file")
+    for path in args.paths:
+        dedup_file(path, args.out)
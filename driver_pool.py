@@ -0,0 +1,414 @@
+import multiprocessing
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from issue_data import create_driver, run_issue_extraction
+from rate_limiter import LIMITER
+
+
+# ----------------------------------------------------
+# WARM BROWSER POOL
+# ----------------------------------------------------
+# Keeps `size` headless Chrome instances open and hands issue URLs to
+# whichever one is free. A browser is recycled (quit + relaunched) after
+# `max_pages` pages, or straight away when its session is lost, so a
+# leaking or dead Chrome never takes the whole crawl down with it. Timeouts
+# and missing elements are WebDriverExceptions too, but they leave a
+# working browser behind, which is kept. A relaunch that fails leaves a
+# None in its slot, and the next extract() tries to launch it again.
+
+POOL_BROWSERS = 4
+PAGES_PER_BROWSER = 200
+FAILURE_BUDGET = 25   # failed issues before a worker process gives up
+
+_SERVER_ERROR_TITLE = re.compile(r"\b5\d\d\b|Service Unavailable|Bad Gateway|Gateway Time-?out")
+
+
+def classify_failure(error, driver):
+    """
+    "throttled" or "server" when a failed extraction says something about
+    the server (a 429 page, a 5xx page, a connection failure), else None.
+    Missing elements and parse errors on a page that did load are not
+    reported to LIMITER, so they cannot trip its circuit breaker.
+    """
+    if isinstance(error, WebDriverException) and "net::ERR_" in str(error):
+        return "server"
+    try:
+        if driver.find_elements(By.CSS_SELECTOR, "ul#issuedetails"):
+            return None   # the issue page itself loaded
+        title = driver.title or ""
+    except Exception:
+        return None
+    if "429" in title or "Too Many Requests" in title:
+        return "throttled"
+    if _SERVER_ERROR_TITLE.search(title):
+        return "server"
+    return None
+
+
+def report_failure(error, driver):
+    kind = classify_failure(error, driver)
+    if kind == "throttled":
+        LIMITER.on_throttle()
+    elif kind == "server":
+        LIMITER.on_error()
+    return kind
+
+
+def session_lost(error, driver):
+    """True when `error` left `driver` unusable (as opposed to a slow or odd page)."""
+    if isinstance(error, InvalidSessionIdException):
+        return True
+    try:
+        driver.current_url   # liveness check: one cheap round trip
+        return False
+    except Exception:
+        return True
+
+
+def ordered_imap(extract, keys, workers):
+    """
+    Run extract(url) for every (key, url) on `workers` threads and yield
+    (key, result, error) in input order, with at most 2 × workers in flight.
+    """
+    def job(url):
+        try:
+            return extract(url), None
+        except Exception as e:
+            return None, e
+
+    keys = iter(keys)
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit_next():
+            item = next(keys, None)
+            if item is not None:
+                in_flight.append((item[0], pool.submit(job, item[1])))
+
+        for _ in range(2 * workers):
+            submit_next()
+
+        while in_flight:
+            key, fut = in_flight.popleft()
+            result, error = fut.result()
+            submit_next()
+            yield key, result, error
+
+
+class DriverPool:
+
+    def __init__(self, size=POOL_BROWSERS, max_pages=PAGES_PER_BROWSER, factory=create_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._all = set()
+        self.stats = {
+            "pages": 0,
+            "errors": 0,
+            "launched": 0,
+            "recycled": 0,
+            "started_at": time.monotonic()
+        }
+
+        try:
+            for _ in range(size):
+                self._idle.put(self._launch())
+        except Exception:
+            self.close()   # quit the browsers that did start
+            raise
+
+    # --------------------------
+    # Browser lifecycle
+    # --------------------------
+    def _launch(self):
+        driver = self.factory()
+        driver.pages_served = 0
+        with self._lock:
+            self._all.add(driver)
+            self.stats["launched"] += 1
+        return driver
+
+    def _retire(self, driver):
+        with self._lock:
+            self._all.discard(driver)
+            self.stats["recycled"] += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release(self, driver, crashed=False):
+        if crashed or driver.pages_served >= self.max_pages:
+            self._retire(driver)
+            try:
+                driver = self._launch()
+            except Exception as e:
+                print(f"Browser relaunch failed, retrying on next use: {e!r}")
+                driver = None
+        self._idle.put(driver)
+
+    def _checkout(self):
+        driver = self._idle.get()
+        if driver is None:
+            try:
+                driver = self._launch()
+            except Exception:
+                self._idle.put(None)   # keep the slot for the next caller
+                raise
+        return driver
+
+    # --------------------------
+    # Extraction
+    # --------------------------
+    def extract(self, url):
+        """Run run_issue_extraction(url) on a free browser."""
+        # wait for the budget first, so throttling does not hold a browser idle
+        LIMITER.acquire()
+        driver = self._checkout()
+        crashed = False
+        try:
+            result = run_issue_extraction(url, driver)
+            LIMITER.on_success()
+            with self._lock:
+                self.stats["pages"] += 1
+            return result
+        except WebDriverException as e:
+            crashed = session_lost(e, driver)
+            report_failure(e, driver)
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        except Exception as e:
+            report_failure(e, driver)
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            driver.pages_served += 1
+            self._release(driver, crashed)
+
+    def imap(self, keys):
+        """
+        Extract every (key, url) and yield (key, issue_obj, error) in input order.
+
+        URLs are spread over all browsers; at most 2 × size are in flight.
+        """
+        return ordered_imap(self.extract, keys, self.size)
+
+    # --------------------------
+    # Stats / shutdown
+    # --------------------------
+    def throughput(self):
+        elapsed = time.monotonic() - self.stats["started_at"]
+        return {
+            **{k: v for k, v in self.stats.items() if k != "started_at"},
+            "elapsed_s": round(elapsed, 1),
+            "pages_per_s": round(self.stats["pages"] / elapsed, 3) if elapsed else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            drivers = list(self._all)
+            self._all.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------------------------------
+# PROCESS POOL: ONE BROWSER PER WORKER PROCESS
+# ----------------------------------------------------
+# Same interface as DriverPool, but every worker is its own process with
+# its own Chrome, so extraction also scales past the GIL. Workers pull
+# (position, key, url) from a shared task queue and send results back to
+# the parent, which hands them to the single writer as they complete, so
+# one slow issue never holds up the writes of the others.
+# A worker that fails `failure_budget` issues stops; its unclaimed work
+# stays in the queue for the other workers.
+
+class WorkerError(Exception):
+    """An extraction failure in a worker process; `kind` is the original exception's class name."""
+
+    def __init__(self, kind, message):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+
+def _process_worker(worker_id, tasks, results, max_pages, failure_budget, rate_share):
+    # each process has its own LIMITER; together they keep the parent's budget
+    LIMITER.share(rate_share)
+
+    driver = None
+    served = 0
+    failures = 0
+    reason = "done"
+
+    def retire():
+        nonlocal driver
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = None
+        results.put(("recycled", worker_id))
+
+    try:
+        while True:
+            item = tasks.get()
+            if item is None:
+                break
+            pos, key, url = item
+            LIMITER.acquire()
+
+            if driver is None:
+                driver = create_driver()
+                served = 0
+                results.put(("launched", worker_id))
+
+            issue_obj, error = None, None
+            try:
+                issue_obj = run_issue_extraction(url, driver)
+                LIMITER.on_success()
+            except WebDriverException as e:
+                error = (type(e).__name__, str(e))
+                report_failure(e, driver)
+                if session_lost(e, driver):
+                    retire()
+            except Exception as e:
+                error = (type(e).__name__, str(e))
+                report_failure(e, driver)
+
+            served += 1
+            results.put(("result", pos, key, issue_obj, error))
+
+            if error is not None:
+                failures += 1
+                if failures >= failure_budget:
+                    reason = "failure budget exhausted"
+                    break
+
+            if driver is not None and served >= max_pages:
+                retire()
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        results.put(("exit", worker_id, reason))
+
+
+class ProcessDriverPool:
+
+    def __init__(self, size=POOL_BROWSERS, max_pages=PAGES_PER_BROWSER,
+                 failure_budget=FAILURE_BUDGET, context="spawn"):
+        self.size = size
+        self.max_pages = max_pages
+        self.failure_budget = failure_budget
+        self.context = context
+        self.stats = {
+            "pages": 0,
+            "errors": 0,
+            "launched": 0,
+            "recycled": 0,
+            "started_at": time.monotonic()
+        }
+
+    def imap(self, keys):
+        """
+        Extract every (key, url) and yield (key, issue_obj, error) as each one
+        completes, which is not necessarily input order.
+
+        `error` is a WorkerError here, since exceptions come from another process.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+
+        ctx = multiprocessing.get_context(self.context)
+        tasks = ctx.Queue()
+        results = ctx.Queue()
+
+        for pos, (key, url) in enumerate(keys):
+            tasks.put((pos, key, url))
+        for _ in range(self.size):
+            tasks.put(None)
+
+        procs = {
+            wid: ctx.Process(
+                target=_process_worker,
+                args=(wid, tasks, results, self.max_pages, self.failure_budget, 1 / self.size),
+                daemon=True
+            )
+            for wid in range(self.size)
+        }
+        for proc in procs.values():
+            proc.start()
+
+        live = set(procs)
+        pending = {pos: key for pos, (key, _) in enumerate(keys)}
+
+        try:
+            while pending:
+                if not live:
+                    # nobody is left to take the remaining issues
+                    for key in pending.values():
+                        yield key, None, WorkerError("NoWorkersLeft", "no browser workers left")
+                    break
+
+                try:
+                    msg = results.get(timeout=1)
+                except queue.Empty:
+                    # a worker that died without saying goodbye
+                    live -= {wid for wid in live if not procs[wid].is_alive()}
+                    continue
+
+                kind = msg[0]
+                if kind == "result":
+                    _, pos, key, issue_obj, error = msg
+                    pending.pop(pos, None)
+                    self.stats["errors" if error else "pages"] += 1
+                    yield key, issue_obj, WorkerError(*error) if error else None
+                elif kind == "launched":
+                    self.stats["launched"] += 1
+                elif kind == "recycled":
+                    self.stats["recycled"] += 1
+                elif kind == "exit":
+                    live.discard(msg[1])
+                    if msg[2] != "done":
+                        print(f"Worker {msg[1]} stopped: {msg[2]}")
+        finally:
+            for proc in procs.values():
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join()
+
+    throughput = DriverPool.throughput
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
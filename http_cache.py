@@ -0,0 +1,197 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlencode
+
+
+# ---------------------------------------------------------
+# ON-DISK HTTP RESPONSE CACHE
+# ---------------------------------------------------------
+# A single SQLite file holding zlib-compressed response bodies, keyed by a
+# hash of URL + sorted query params + Accept header. Entries keep the
+# server's ETag / Last-Modified so stale ones can be revalidated with a
+# conditional GET (a 304 costs no body). Entries younger than `ttl`
+# seconds are served without any request; the file is kept under
+# `max_bytes` by evicting the least recently used bodies.
+# A hit only touches memory: last_used updates are collected and written in
+# one transaction every TOUCH_BATCH hits or TOUCH_INTERVAL seconds, before
+# an eviction and on close(), so an offline rebuild is not one fsync per hit.
+
+CACHE_PATH = "http_cache.sqlite"
+CACHE_TTL = 24 * 3600
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+TOUCH_BATCH = 1000
+TOUCH_INTERVAL = 30.0   # seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,
+    body          BLOB NOT NULL,
+    encoding      TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    last_used     REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(url, params=None, accept=None):
+    query = urlencode(sorted((params or {}).items()))
+    raw = f"{url}?{query}|{accept or ''}"
+    return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+
+class CachedResponse:
+
+    def __init__(self, key, body, encoding, etag, last_modified, fetched_at):
+        self.key = key
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or "utf-8")
+
+    def validators(self):
+        """Headers for a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._touched = {}   # key → last_used not written yet
+        self._touched_since = time.monotonic()
+
+        self.stats = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "stored": 0,
+            "evicted": 0,
+            "discarded": 0
+        }
+
+    def lookup(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, encoding, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, encoding, etag, last_modified, fetched_at = row
+        return CachedResponse(key, zlib.decompress(body), encoding, etag, last_modified, fetched_at)
+
+    def is_fresh(self, cached):
+        return time.time() - cached.fetched_at < self.ttl
+
+    def hit(self, cached):
+        """Serve `cached` as is and mark it recently used (written in batches)."""
+        with self._lock:
+            self.stats["hits"] += 1
+            self._touched[cached.key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH or \
+                    time.monotonic() - self._touched_since >= TOUCH_INTERVAL:
+                self._flush_touched()
+                self._db.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany("UPDATE responses SET last_used = ? WHERE key = ?",
+                                 [(t, key) for key, t in self._touched.items()])
+            self._touched.clear()
+        self._touched_since = time.monotonic()
+
+    def revalidated(self, cached):
+        """The server answered 304: the entry is fresh again."""
+        now = time.time()
+        with self._lock:
+            self.stats["revalidated"] += 1
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ?, last_used = ? WHERE key = ?",
+                (now, now, cached.key)
+            )
+            self._db.commit()
+
+    def miss(self):
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def store(self, key, url, body, encoding=None, etag=None, last_modified=None):
+        packed = zlib.compress(body)
+        now = time.time()
+
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, packed, encoding, etag, last_modified, now, now, len(packed))
+            )
+            self._total += len(packed) - (old[0] if old else 0)
+            self.stats["stored"] += 1
+            self._evict()
+            self._db.commit()
+
+    def discard(self, key):
+        """Drop the entry for `key` (e.g. a body that turned out not to parse)."""
+        with self._lock:
+            row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._touched.pop(key, None)
+            self._total -= row[0]
+            self.stats["discarded"] += 1
+            self._db.commit()
+
+    def _evict(self):
+        if self._total > self.max_bytes:
+            self._flush_touched()   # so recently hit entries are not evicted
+        while self._total > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total -= size
+                self.stats["evicted"] += 1
+                if self._total <= self.max_bytes:
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "bytes": self._total}
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+            self._db = None
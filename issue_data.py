@@ -1,12 +1,35 @@
+import threading
+import time
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from metrics import METRICS, timed
+
 chrome_binary_path = r"C:\Program Files (x86)\chrome-win64\chrome-win64\chrome.exe"
 PATH = r"C:\Program Files (x86)\chromedriver.exe"
 
+MODULE_WAIT = 10   # seconds each optional module used to be waited for
+
+# Optional page modules. Which of these exist is checked once, after
+# ul#issuedetails has loaded; only modules that exist are waited for.
+MODULE_SELECTORS = {
+    "description": "div#descriptionmodule div.user-content-block",
+    "issue_links": "div.links-container",
+    "comments": "li#comment-tabpanel a",
+}
+
+# Totals across every issue extracted in this process
+WAIT_STATS = {
+    "issues": 0,
+    "skipped_waits": 0,
+    "wait_saved_s": 0
+}
+_wait_stats_lock = threading.Lock()
+
 
 # --------------------------------------------------
 # Helper: safe extraction
@@ -21,6 +44,7 @@ def safe_text(driver, selector):
 # --------------------------------------------------
 # Extract: metadata block
 # --------------------------------------------------
+@timed()
 def extract_metadata(driver):
     return {
         "type": safe_text(driver, "#type-val"),
@@ -37,6 +61,7 @@ def extract_metadata(driver):
 # --------------------------------------------------
 # Extract: reporter, assignee, votes, watchers
 # --------------------------------------------------
+@timed()
 def extract_people(driver):
     return {
         "assignee": safe_text(driver, "#assignee-val"),
@@ -46,6 +71,7 @@ def extract_people(driver):
     }
 
 
+@timed()
 def extract_dates(driver):
     def safe_text(selector):
         try:
@@ -67,8 +93,9 @@ def extract_dates(driver):
     }
 
 
+@timed()
 def extract_description(driver):
-    wait = WebDriverWait(driver, 10)
+    wait = WebDriverWait(driver, MODULE_WAIT)
 
     try:
         # Wait for the description block
@@ -89,8 +116,9 @@ def extract_description(driver):
     # Join paragraphs with line breaks
     return "\n\n".join(description_text)
 
+@timed()
 def extract_issue_links(driver):
-    wait = WebDriverWait(driver, 10)
+    wait = WebDriverWait(driver, MODULE_WAIT)
 
     try:
         links_container = wait.until(
@@ -154,8 +182,9 @@ def extract_issue_links(driver):
 
     return link_data
 
+@timed()
 def extract_comments(driver):
-    wait = WebDriverWait(driver, 10)
+    wait = WebDriverWait(driver, MODULE_WAIT)
 
     # ----------------------------
     # STEP 1 — Click "Comments" tab
@@ -223,6 +252,7 @@ def extract_comments(driver):
 
     return comments
 
+@timed()
 def extract_summary(driver):
     def safe_text(selector):
         try:
@@ -243,37 +273,202 @@ def extract_summary(driver):
 
 
 # --------------------------------------------------
-# MAIN EXTRACTION METHOD
+# MODULE PRESENCE
 # --------------------------------------------------
-def run_issue_extraction(issue_url):
-    service = Service(PATH)
-    options = webdriver.ChromeOptions()
-    options.binary_location = chrome_binary_path
-    options.add_argument("--headless")
+DETECT_MODULES_JS = """
+const found = {};
+for (const [name, sel] of Object.entries(arguments[0])) {
+    found[name] = !!document.querySelector(sel);
+}
+return found;
+"""
 
-    driver = webdriver.Chrome(service=service, options=options)
-    wait = WebDriverWait(driver, 15)
 
-    print("Opening issue:", issue_url)
-    driver.get(issue_url)
+def detect_modules(driver):
+    """{module: bool} for MODULE_SELECTORS, in one WebDriver call."""
+    return driver.execute_script(DETECT_MODULES_JS, MODULE_SELECTORS)
+
+
+def record_skipped_waits(present, timing):
+    """Note which module waits element mode skipped for this issue and what that saved."""
+    skipped = [name for name, found in present.items() if not found]
+    timing["skipped_waits"] = skipped
+    timing["wait_saved_s"] = len(skipped) * MODULE_WAIT
+
+    with _wait_stats_lock:
+        WAIT_STATS["issues"] += 1
+        WAIT_STATS["skipped_waits"] += len(skipped)
+        WAIT_STATS["wait_saved_s"] += timing["wait_saved_s"]
+
+
+# --------------------------------------------------
+# BATCH EXTRACTION (ONE execute_script PER PAGE)
+# --------------------------------------------------
+# Reads every field above in a single injected script instead of one
+# WebDriver round trip per find_element/.text/get_attribute. The result
+# has exactly the dict shape the extract_* functions build together.
+# `.text` is mirrored with innerText (nbsp → space, trimmed) and
+# get_attribute with "property if set, else attribute", like Selenium.
+#
+# Comments live behind the "Comments" tab, which may be loaded by AJAX.
+# If that panel is not on the page yet the script returns comments=None
+# and extract_comments_batched clicks the tab and reads it in one more call.
+BATCH_EXTRACT_JS = r"""
+const onlyComments = arguments[0] === "comments";
+
+const clean = (el) => el.innerText.replace(/\u00a0/g, " ").trim();
+const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? clean(el) : null;
+};
+const attr = (root, sel, name) => {
+    const el = root.querySelector(sel);
+    if (!el) return null;
+    const v = el[name];
+    return (v !== undefined && v !== null) ? String(v) : el.getAttribute(name);
+};
+
+function comments() {
+    const tab = document.querySelector("li#comment-tabpanel");
+    const container = document.querySelector("#issue_actions_container");
+    if (!tab) return [];
+    if (!container || !tab.classList.contains("active")) return null;
+    if (container.innerText.includes("There are no comments")) return [];
+
+    return Array.from(
+        container.querySelectorAll("div.activity-item.activity-comment")
+    ).map((item) => {
+        const time = item.querySelector(".action-details time");
+        return {
+            author: text(item, ".action-details .user-hover"),
+            display_time: time ? clean(time) : null,
+            iso_time: time ? attr(item, ".action-details time", "datetime") : null,
+            text: text(item, ".comment-body"),
+        };
+    });
+}
+
+if (onlyComments) return {comments: comments()};
+
+function description() {
+    const blocks = document.querySelectorAll("div#descriptionmodule div.user-content-block");
+    if (!blocks.length) return null;
+    return Array.from(blocks).map(clean).join("\n\n");
+}
+
+function issueLinks() {
+    const container = document.querySelector("div.links-container");
+    if (!container) return [];
+
+    const links = [];
+    container.querySelectorAll("dl.links-list").forEach((group) => {
+        const relationship = text(group, "dt");
+        group.querySelectorAll("dd").forEach((dd) => {
+            const keyEl = dd.querySelector("a.issue-link");
+            links.push({
+                type: relationship,
+                key: keyEl ? clean(keyEl) : null,
+                url: keyEl ? attr(dd, "a.issue-link", "href") : null,
+                summary: text(dd, "span.link-summary"),
+                priority: attr(dd, "ul.link-snapshot li.priority img", "title"),
+                status: text(dd, "ul.link-snapshot li.status span"),
+            });
+        });
+    });
+    return links;
+}
+
+return {
+    summary: {
+        issue_key: text(document, "#key-val"),
+        issue_summary: text(document, "#summary-val"),
+    },
+    metadata: {
+        type: text(document, "#type-val"),
+        status: text(document, "#status-val"),
+        priority: text(document, "#priority-val"),
+        resolution: text(document, "#resolution-val"),
+        affects_versions: text(document, "#versions-val"),
+        fix_versions: text(document, "#fixfor-val"),
+        labels: text(document, "div#wrap-labels .labels"),
+        environment: text(document, "#environment-val"),
+    },
+    people: {
+        assignee: text(document, "#assignee-val"),
+        reporter: text(document, "#reporter-val"),
+        votes: text(document, "#vote-data"),
+        watchers: text(document, "#watcher-data"),
+    },
+    dates: {
+        created_display: text(document, "#created-val time"),
+        created_iso: attr(document, "#created-val time", "datetime"),
+        updated_display: text(document, "#updated-val time"),
+        updated_iso: attr(document, "#updated-val time", "datetime"),
+    },
+    description: description(),
+    issue_links: issueLinks(),
+    comments: comments(),
+};
+"""
+
+
+@timed()
+def extract_comments_batched(driver):
+    wait = WebDriverWait(driver, MODULE_WAIT)
+
+    try:
+        comments_tab = wait.until(
+            EC.element_to_be_clickable(
+                (By.CSS_SELECTOR, "li#comment-tabpanel a")
+            )
+        )
+        driver.execute_script("arguments[0].click();", comments_tab)
+    except:
+        return []   # No comments tab or cannot click
+
+    wait.until(
+        EC.presence_of_element_located(
+            (By.CSS_SELECTOR, "#issue_actions_container")
+        )
+    )
+
+    return driver.execute_script(BATCH_EXTRACT_JS, "comments")["comments"] or []
 
-    # Wait for metadata to load
-    wait.until(EC.presence_of_element_located(
-        (By.CSS_SELECTOR, "ul#issuedetails.property-list")
-    ))
+
+@timed()
+def extract_all_batched(driver, timing):
+    data = driver.execute_script(BATCH_EXTRACT_JS, "all")
+    # one script reads every module, so no per-module wait is ever made to skip
+    timing["skipped_waits"] = []
+    timing["wait_saved_s"] = 0
+
+    if data["comments"] is None:
+        data["comments"] = extract_comments_batched(driver)
+
+    return {
+        "summary": data["summary"],
+        "metadata": data["metadata"],
+        "people": data["people"],
+        "dates": data["dates"],
+        "description": data["description"],
+        "issue_links": data["issue_links"],
+        "comments": data["comments"]
+    }
+
+
+@timed()
+def extract_all_elements(driver, timing):
+    present = detect_modules(driver)
+    record_skipped_waits(present, timing)
 
     # Run extraction functions
     summary = extract_summary(driver)
     metadata = extract_metadata(driver)
     people = extract_people(driver)
     dates = extract_dates(driver)
-    description = extract_description(driver)
-    issue_links = extract_issue_links(driver)
-    comments = extract_comments(driver)
-
-
-    # Close browser
-    driver.quit()
+    description = extract_description(driver) if present["description"] else None
+    issue_links = extract_issue_links(driver) if present["issue_links"] else []
+    comments = extract_comments(driver) if present["comments"] else []
 
     # Return a combined dict
     return {
@@ -287,3 +482,95 @@ def run_issue_extraction(issue_url):
     }
 
 
+EXTRACTORS = {
+    "batch": extract_all_batched,
+    "elements": extract_all_elements,
+}
+EXTRACTION_MODE = "batch"
+
+
+# --------------------------------------------------
+# BROWSER
+# --------------------------------------------------
+def create_driver():
+    service = Service(PATH)
+    options = webdriver.ChromeOptions()
+    options.binary_location = chrome_binary_path
+    options.add_argument("--headless")
+
+    return webdriver.Chrome(service=service, options=options)
+
+
+# --------------------------------------------------
+# MAIN EXTRACTION METHOD
+# --------------------------------------------------
+def run_issue_extraction(issue_url, driver=None, mode=None):
+    """
+    Extract one issue page.
+
+    Pass an open `driver` to reuse a running browser; it is left open.
+    Without one a browser is started for this issue and closed afterwards.
+    `mode` picks "batch" (one injected script) or "elements" (one WebDriver
+    call per field); it defaults to EXTRACTION_MODE.
+    """
+    mode = mode or EXTRACTION_MODE
+
+    if driver is None:
+        driver = create_driver()
+        try:
+            return run_issue_extraction(issue_url, driver, mode)
+        finally:
+            # Close browser
+            driver.quit()
+
+    wait = WebDriverWait(driver, 15)
+    started = time.monotonic()
+
+    print("Opening issue:", issue_url)
+    with METRICS.timer("page_load"):
+        driver.get(issue_url)
+
+        # Wait for metadata to load
+        wait.until(EC.presence_of_element_located(
+            (By.CSS_SELECTOR, "ul#issuedetails.property-list")
+        ))
+
+    timing = {}
+    result = EXTRACTORS[mode](driver, timing)
+
+    took = time.monotonic() - started
+    if timing["skipped_waits"]:
+        print(f"  done in {took:.1f}s, skipped waits for {', '.join(timing['skipped_waits'])} "
+              f"(~{timing['wait_saved_s']}s saved)")
+    else:
+        print(f"  done in {took:.1f}s")
+
+    return result
+
+
+# --------------------------------------------------
+# PARITY CHECK BETWEEN EXTRACTION MODES
+# --------------------------------------------------
+def _diff(a, b, path=""):
+    if isinstance(a, dict) and isinstance(b, dict):
+        diffs = []
+        for k in sorted(set(a) | set(b)):
+            diffs += _diff(a.get(k), b.get(k), f"{path}.{k}")
+        return diffs
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        diffs = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            diffs += _diff(x, y, f"{path}[{i}]")
+        return diffs
+    return [] if a == b else [(path or ".", a, b)]
+
+
+def compare_extraction_modes(issue_url, driver=None):
+    """
+    Extract `issue_url` in both modes and return [(path, batch, elements)]
+    for every field that differs. Works on live pages and on saved HTML
+    fixtures opened as file:// URLs.
+    """
+    batch = run_issue_extraction(issue_url, driver, mode="batch")
+    elements = run_issue_extraction(issue_url, driver, mode="elements")
+    return _diff(batch, elements)
@@ -0,0 +1,360 @@
+import argparse
+import re
+import threading
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+from driver_pool import DriverPool, ordered_imap
+from issue_data import create_driver, run_issue_extraction
+from metrics import timed
+from scraper import get_with_retry, is_offline, project_of
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+# --------------------------------------------------
+# HTTP-ONLY ISSUE EXTRACTION
+# --------------------------------------------------
+# The issue page is server-rendered, so everything issue_data.py reads with
+# a browser is already in the HTML. This backend fetches the page over the
+# pooled session in scraper.py, parses it with BeautifulSoup and builds the
+# same dict as run_issue_extraction, using the same CSS selectors.
+# Only when the comments panel needs JS (not the active tab, or older
+# comments collapsed) does it hand the issue to Selenium.
+
+HTML_HEADERS = {"Accept": "text/html,application/xhtml+xml"}
+
+COMMENTS_NEED_JS = ".show-more-comment-tabpanel, a.collapsed-comments"
+
+BLOCK_TAGS = {
+    "address", "blockquote", "dd", "div", "dl", "dt", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "li", "ol", "p", "pre", "table", "tr", "ul"
+}
+
+HTTP_STATS = {
+    "parsed": 0,
+    "fallbacks": 0
+}
+_stats_lock = threading.Lock()
+
+
+# --------------------------------------------------
+# Helpers: Selenium-like text and attributes
+# --------------------------------------------------
+def visible_text(el):
+    """
+    Approximate WebElement.text: block elements and <br> start new lines,
+    runs of whitespace collapse (except inside <pre>), nbsp becomes a space.
+    """
+    parts = []
+
+    def walk(node, pre):
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                parts.append(str(child) if pre else re.sub(r"\s+", " ", str(child)))
+                continue
+            if child.name in ("script", "style"):
+                continue
+            if child.name == "br":
+                parts.append("\n")
+                continue
+
+            block = child.name in BLOCK_TAGS
+            if block:
+                parts.append("\n")
+            walk(child, pre or child.name == "pre")
+            if block:
+                parts.append("\n")
+
+    walk(el, el.name == "pre")
+    text = "".join(parts).replace("\xa0", " ")
+    lines = [line.strip() for line in text.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def text(root, selector):
+    el = root.select_one(selector)
+    return visible_text(el) if el is not None else None
+
+
+def attr(root, selector, name, base_url=None):
+    el = root.select_one(selector)
+    if el is None:
+        return None
+    if name == "href":
+        return urljoin(base_url, el.get("href", ""))
+    if name == "title":
+        return el.get("title", "")
+    return el.get(name)
+
+
+# --------------------------------------------------
+# Extract: same sections as issue_data.py
+# --------------------------------------------------
+def parse_summary(soup):
+    return {
+        "issue_key": text(soup, "#key-val"),
+        "issue_summary": text(soup, "#summary-val")
+    }
+
+
+def parse_metadata(soup):
+    return {
+        "type": text(soup, "#type-val"),
+        "status": text(soup, "#status-val"),
+        "priority": text(soup, "#priority-val"),
+        "resolution": text(soup, "#resolution-val"),
+        "affects_versions": text(soup, "#versions-val"),
+        "fix_versions": text(soup, "#fixfor-val"),
+        "labels": text(soup, "div#wrap-labels .labels"),
+        "environment": text(soup, "#environment-val"),
+    }
+
+
+def parse_people(soup):
+    return {
+        "assignee": text(soup, "#assignee-val"),
+        "reporter": text(soup, "#reporter-val"),
+        "votes": text(soup, "#vote-data"),
+        "watchers": text(soup, "#watcher-data"),
+    }
+
+
+def parse_dates(soup):
+    return {
+        "created_display": text(soup, "#created-val time"),
+        "created_iso": attr(soup, "#created-val time", "datetime"),
+        "updated_display": text(soup, "#updated-val time"),
+        "updated_iso": attr(soup, "#updated-val time", "datetime"),
+    }
+
+
+def parse_description(soup):
+    blocks = soup.select("div#descriptionmodule div.user-content-block")
+    if not blocks:
+        return None
+    return "\n\n".join(visible_text(block) for block in blocks)
+
+
+def parse_issue_links(soup, base_url):
+    container = soup.select_one("div.links-container")
+    if container is None:
+        return []
+
+    link_data = []
+    for group in container.select("dl.links-list"):
+        relationship_type = text(group, "dt")
+
+        for dd in group.select("dd"):
+            key_el = dd.select_one("a.issue-link")
+            link_data.append({
+                "type": relationship_type,
+                "key": visible_text(key_el) if key_el is not None else None,
+                "url": attr(dd, "a.issue-link", "href", base_url) if key_el is not None else None,
+                "summary": text(dd, "span.link-summary"),
+                "priority": attr(dd, "ul.link-snapshot li.priority img", "title"),
+                "status": text(dd, "ul.link-snapshot li.status span"),
+            })
+
+    return link_data
+
+
+def comments_need_js(soup):
+    """True when the comments in the HTML are not the complete list."""
+    tab = soup.select_one("li#comment-tabpanel")
+    if tab is None:
+        return False
+    if "active" not in (tab.get("class") or []):
+        return True
+    if soup.select_one("#issue_actions_container") is None:
+        return True
+    return soup.select_one(COMMENTS_NEED_JS) is not None
+
+
+def parse_comments(soup):
+    if soup.select_one("li#comment-tabpanel") is None:
+        return []
+
+    container = soup.select_one("#issue_actions_container")
+    if "There are no comments" in visible_text(container):
+        return []
+
+    comments = []
+    for item in container.select("div.activity-item.activity-comment"):
+        time_tag = item.select_one(".action-details time")
+        comments.append({
+            "author": text(item, ".action-details .user-hover"),
+            "display_time": visible_text(time_tag) if time_tag is not None else None,
+            "iso_time": time_tag.get("datetime") if time_tag is not None else None,
+            "text": text(item, ".comment-body")
+        })
+
+    return comments
+
+
+@timed("html_parse")
+def parse_issue_html(html, issue_url):
+    """
+    Build the run_issue_extraction dict from issue page HTML.
+
+    Returns None when the page cannot be handled without a browser.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    if soup.select_one("ul#issuedetails.property-list") is None or comments_need_js(soup):
+        return None
+
+    return {
+        "summary": parse_summary(soup),
+        "metadata": parse_metadata(soup),
+        "people": parse_people(soup),
+        "dates": parse_dates(soup),
+        "description": parse_description(soup),
+        "issue_links": parse_issue_links(soup, issue_url),
+        "comments": parse_comments(soup)
+    }
+
+
+# --------------------------------------------------
+# MAIN EXTRACTION METHOD (HTTP BACKEND)
+# --------------------------------------------------
+def run_issue_extraction_http(issue_url, driver=None, fallback=None):
+    """
+    Same result as issue_data.run_issue_extraction, without a browser when
+    the HTML is enough. Otherwise falls back to fallback(issue_url), or to
+    Selenium on `driver` (a new browser if None).
+    """
+    html = get_with_retry(issue_url, headers=HTML_HEADERS, as_text=True,
+                          project=project_of(issue_url.rstrip("/").rsplit("/", 1)[-1]),
+                          phase="html_fetch")
+    issue_obj = parse_issue_html(html, issue_url) if html else None
+
+    if issue_obj is not None:
+        with _stats_lock:
+            HTTP_STATS["parsed"] += 1
+        return issue_obj
+
+    if is_offline():
+        raise RuntimeError(f"{issue_url} is not in the response cache or needs a browser")
+
+    with _stats_lock:
+        HTTP_STATS["fallbacks"] += 1
+
+    if fallback is not None:
+        return fallback(issue_url)
+    return run_issue_extraction(issue_url, driver)
+
+
+class HttpPool:
+    """
+    DriverPool-compatible front end for the HTTP backend: `size` threads
+    fetch and parse pages; a single browser, started on first need, takes
+    the issues that fall back to Selenium.
+    """
+
+    def __init__(self, size=8):
+        self.size = size
+        self._fallback = None
+        self._lock = threading.Lock()
+        self.stats = {"pages": 0, "errors": 0, "started_at": time.monotonic()}
+
+    def _fallback_pool(self):
+        with self._lock:
+            if self._fallback is None:
+                self._fallback = DriverPool(size=1)
+            return self._fallback
+
+    def extract(self, url):
+        try:
+            issue_obj = run_issue_extraction_http(
+                url, fallback=lambda u: self._fallback_pool().extract(u)
+            )
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+
+        with self._lock:
+            self.stats["pages"] += 1
+        return issue_obj
+
+    def imap(self, keys):
+        return ordered_imap(self.extract, keys, self.size)
+
+    def throughput(self):
+        elapsed = time.monotonic() - self.stats["started_at"]
+        fallback = self._fallback.throughput() if self._fallback else {}
+        return {
+            "pages": self.stats["pages"],
+            "errors": self.stats["errors"],
+            "launched": fallback.get("launched", 0),
+            "recycled": fallback.get("recycled", 0),
+            "fallbacks": HTTP_STATS["fallbacks"],
+            "elapsed_s": round(elapsed, 1),
+            "pages_per_s": round(self.stats["pages"] / elapsed, 3) if elapsed else 0.0
+        }
+
+    def close(self):
+        if self._fallback is not None:
+            self._fallback.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------------------------------------------
+# BENCHMARK: issues/sec per backend
+# --------------------------------------------------
+def benchmark_backends(urls, backends=("http", "selenium")):
+    """Extract `urls` one after another with each backend and report issues/s."""
+    report = {}
+
+    for backend in backends:
+        driver = create_driver() if backend == "selenium" else None
+        started = time.monotonic()
+        done = 0
+
+        try:
+            for url in urls:
+                try:
+                    if backend == "http":
+                        run_issue_extraction_http(url)
+                    else:
+                        run_issue_extraction(url, driver)
+                    done += 1
+                except Exception as e:
+                    print(f"❌ {backend} failed on {url}: {e}")
+        finally:
+            if driver is not None:
+                driver.quit()
+
+        elapsed = time.monotonic() - started
+        report[backend] = {
+            "issues": done,
+            "seconds": round(elapsed, 2),
+            "issues_per_s": round(done / elapsed, 3) if elapsed else 0.0
+        }
+
+    if "http" in report:
+        report["http"]["selenium_fallbacks"] = HTTP_STATS["fallbacks"]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTTP and Selenium issue extraction speed")
+    parser.add_argument("urls", nargs="+", help="issue page URLs, e.g. https://issues.apache.org/jira/browse/ABDERA-1")
+    args = parser.parse_args()
+
+    for backend, result in benchmark_backends(args.urls).items():
+        print(f"{backend:>9}: {result}")
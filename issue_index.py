@@ -0,0 +1,341 @@
+import argparse
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from columnar_writer import parse_time
+
+
+# ---------------------------------------------------------
+# LOCAL ISSUE INDEX
+# ---------------------------------------------------------
+# One SQLite file that both scrapers can feed as they write, so looking
+# up an issue or filtering a project does not mean scanning its JSONL:
+#   issues      one row per key: project, status, type, priority,
+#               created/updated (UTC ISO strings, so they sort), title,
+#               the file it came from and the zlib-compressed record
+#   labels      (id, label) pairs, indexed on label
+#   issues_fts  FTS5 over title, description and comments (porter stemmed)
+# Records are upserted by key, so re-ingesting a file (after a resume,
+# a sync or a dedup pass) replaces rows instead of duplicating them.
+# Both record shapes are understood: the REST dataset ({p}_dataset.jsonl)
+# and the browser output (output/{project}.jsonl).
+# The database runs in WAL mode, so queries can run during a crawl.
+
+INDEX_PATH = "jira_index.sqlite"
+INGEST_BATCH = 1000   # issues per transaction when ingesting a file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    id       INTEGER PRIMARY KEY,
+    key      TEXT NOT NULL UNIQUE,
+    project  TEXT,
+    status   TEXT,
+    type     TEXT,
+    priority TEXT,
+    created  TEXT,
+    updated  TEXT,
+    title    TEXT,
+    source   TEXT,
+    doc      BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_project_updated ON issues (project, updated);
+CREATE INDEX IF NOT EXISTS issues_status ON issues (status, project);
+CREATE INDEX IF NOT EXISTS issues_type ON issues (type, project);
+CREATE INDEX IF NOT EXISTS issues_created ON issues (created);
+CREATE TABLE IF NOT EXISTS labels (
+    id    INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (id, label)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS labels_label ON labels (label);
+CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(
+    title, description, comments, tokenize = 'porter unicode61'
+);
+"""
+
+# filter name → SQL condition on `issues i`
+FILTERS = {
+    "project": "i.project = ?",
+    "status": "i.status = ?",
+    "type": "i.type = ?",
+    "priority": "i.priority = ?",
+    "label": "i.id IN (SELECT id FROM labels WHERE label = ?)",
+    "created_after": "i.created >= ?",
+    "created_before": "i.created < ?",
+    "updated_after": "i.updated >= ?",
+    "updated_before": "i.updated < ?",
+}
+
+
+def _iso(value):
+    moment = parse_time(value)
+    return moment.isoformat() if moment else None
+
+
+def index_row(obj):
+    """The indexed fields of a REST or browser record, as a dict."""
+    if isinstance(obj.get("summary"), dict):
+        # browser record (issue_data.py)
+        key = obj["summary"].get("issue_key")
+        metadata = obj.get("metadata") or {}
+        dates = obj.get("dates") or {}
+        labels = metadata.get("labels") or ""
+        return {
+            "key": key,
+            "project": key.rsplit("-", 1)[0] if key else None,
+            "status": metadata.get("status"),
+            "type": metadata.get("type"),
+            "priority": metadata.get("priority"),
+            "created": _iso(dates.get("created_iso")),
+            "updated": _iso(dates.get("updated_iso")),
+            "title": obj["summary"].get("issue_summary"),
+            "labels": [label for label in labels.split() if label != "None"],
+            "description": obj.get("description") or "",
+            "comments": "\n".join(c.get("text") or "" for c in obj.get("comments") or []),
+        }
+
+    return {
+        "key": obj.get("key"),
+        "project": obj.get("project"),
+        "status": obj.get("status"),
+        "type": obj.get("type"),
+        "priority": obj.get("priority"),
+        "created": _iso(obj.get("created")),
+        "updated": _iso(obj.get("updated")),
+        "title": obj.get("title"),
+        "labels": obj.get("labels") or [],
+        "description": obj.get("description") or "",
+        "comments": "\n".join(c.get("body") or "" for c in obj.get("comments") or []),
+    }
+
+
+def fts_query(text):
+    """
+    Plain search words → an FTS5 query matching all of them. Each word is
+    quoted, so keys, paths and punctuation are taken literally; a trailing
+    * keeps its prefix meaning.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class IssueIndex:
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        try:
+            self._db.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            if "fts5" in str(e):
+                raise RuntimeError("The issue index needs an SQLite build with FTS5")
+            raise
+        self.stats = {"added": 0, "replaced": 0}
+
+    # --------------------------
+    # Ingest
+    # --------------------------
+    def add(self, obj, source=None):
+        """Insert or replace one record; visible to other connections after commit()."""
+        row = index_row(obj)
+        if not row["key"]:
+            return False
+        doc = zlib.compress(json.dumps(obj, ensure_ascii=False).encode("utf8"), 1)
+        values = (row["project"], row["status"], row["type"], row["priority"],
+                  row["created"], row["updated"], row["title"], source, doc)
+
+        with self._lock:
+            found = self._db.execute("SELECT id FROM issues WHERE key = ?", (row["key"],)).fetchone()
+            if found:
+                issue_id = found[0]
+                self._db.execute(
+                    "UPDATE issues SET project = ?, status = ?, type = ?, priority = ?, created = ?, "
+                    "updated = ?, title = ?, source = ?, doc = ? WHERE id = ?", values + (issue_id,)
+                )
+                self._db.execute("DELETE FROM labels WHERE id = ?", (issue_id,))
+                self._db.execute("DELETE FROM issues_fts WHERE rowid = ?", (issue_id,))
+                self.stats["replaced"] += 1
+            else:
+                issue_id = self._db.execute(
+                    "INSERT INTO issues (key, project, status, type, priority, created, updated, "
+                    "title, source, doc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (row["key"],) + values
+                ).lastrowid
+                self.stats["added"] += 1
+
+            self._db.executemany("INSERT OR IGNORE INTO labels VALUES (?, ?)",
+                                 [(issue_id, label) for label in row["labels"]])
+            self._db.execute(
+                "INSERT INTO issues_fts (rowid, title, description, comments) VALUES (?, ?, ?, ?)",
+                (issue_id, row["title"] or "", row["description"], row["comments"])
+            )
+        return True
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def ingest_file(self, path, batch=INGEST_BATCH):
+        """Upsert every record of a JSONL file; returns the number indexed."""
+        count = 0
+        with open(path, encoding="utf8") as f:
+            for line in f:
+                if line.strip() and self.add(json.loads(line), source=path):
+                    count += 1
+                    if count % batch == 0:
+                        self.commit()
+        self.commit()
+        return count
+
+    # --------------------------
+    # Query
+    # --------------------------
+    def get(self, key):
+        """The full record stored for `key`, None if it is not indexed."""
+        with self._lock:
+            row = self._db.execute("SELECT doc FROM issues WHERE key = ?", (key,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def _where(self, text, raw, filters):
+        conditions, params = [], []
+        if text:
+            conditions.append("issues_fts MATCH ?")
+            params.append(text if raw else fts_query(text))
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in FILTERS:
+                raise ValueError(f"unknown filter: {name}")
+            if name.endswith(("_after", "_before")):
+                value = _iso(value) or value
+            conditions.append(FILTERS[name])
+            params.append(value)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def search(self, text=None, raw=False, limit=20, **filters):
+        """
+        Issues matching `text` (all words, or FTS5 syntax with raw=True) and
+        the given filters (see FILTERS), best match first, else newest first.
+        Returns dicts with key, project, status, type, priority, created,
+        updated, title and, for text searches, a snippet.
+        """
+        where, params = self._where(text, raw, filters)
+        if text:
+            sql = ("SELECT i.key, i.project, i.status, i.type, i.priority, i.created, i.updated, i.title, "
+                   "snippet(issues_fts, -1, '[', ']', '…', 12) "
+                   "FROM issues_fts JOIN issues i ON i.id = issues_fts.rowid"
+                   f"{where} ORDER BY issues_fts.rank LIMIT ?")
+        else:
+            sql = ("SELECT i.key, i.project, i.status, i.type, i.priority, i.created, i.updated, i.title, "
+                   f"NULL FROM issues i{where} ORDER BY i.updated DESC LIMIT ?")
+
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit]).fetchall()
+        fields = ("key", "project", "status", "type", "priority", "created", "updated", "title", "snippet")
+        return [{k: v for k, v in zip(fields, row) if v is not None or k != "snippet"} for row in rows]
+
+    def count(self, text=None, raw=False, **filters):
+        where, params = self._where(text, raw, filters)
+        source = "issues_fts JOIN issues i ON i.id = issues_fts.rowid" if text else "issues i"
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {source}{where}", params).fetchone()[0]
+
+    def summary(self):
+        """Issue counts per project and status."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT project, status, COUNT(*) FROM issues GROUP BY project, status ORDER BY project, status"
+            ).fetchall()
+        out = {}
+        for project, status, n in rows:
+            out.setdefault(project, {})[status] = n
+        return out
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------
+# QUERY CLI
+# ---------------------------------------------------------
+
+def print_results(rows, total, seconds):
+    for row in rows:
+        updated = (row["updated"] or "")[:10]
+        print(f"{row['key']:<16} {row['status'] or '-':<14} {row['type'] or '-':<12} {updated:<10}  "
+              f"{row['title'] or ''}")
+        if row.get("snippet"):
+            print(f"{'':<16} {' '.join(row['snippet'].split())}")
+    print(f"\n{len(rows)} of {total} issues in {seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index scraped datasets and query them")
+    parser.add_argument("--index", default=INDEX_PATH, help="SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="upsert JSONL datasets into the index")
+    ingest.add_argument("paths", nargs="+", help="e.g. HADOOP_dataset.jsonl output/ABDERA.jsonl")
+
+    get = commands.add_parser("get", help="print the stored record of one issue")
+    get.add_argument("key")
+
+    search = commands.add_parser("search", help="full-text search and/or filter issues")
+    search.add_argument("text", nargs="?", help="words that must all appear (title, description, comments)")
+    search.add_argument("--raw", action="store_true", help="TEXT is an FTS5 query (OR, NEAR, \"phrases\"...)")
+    for name in FILTERS:
+        search.add_argument("--" + name.replace("_", "-"), dest=name,
+                            help="YYYY-MM-DD or a Jira timestamp" if name.endswith(("_after", "_before")) else None)
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+
+    commands.add_parser("stats", help="issue counts per project and status")
+    args = parser.parse_args()
+
+    with IssueIndex(args.index) as index:
+        if args.command == "ingest":
+            for path in args.paths:
+                started = time.monotonic()
+                count = index.ingest_file(path)
+                print(f"Indexed {count} issues from {path} in {time.monotonic() - started:.1f}s")
+
+        elif args.command == "get":
+            issue = index.get(args.key.upper())
+            if issue is None:
+                raise SystemExit(f"{args.key} is not in {args.index}")
+            print(json.dumps(issue, indent=2, ensure_ascii=False))
+
+        elif args.command == "search":
+            filters = {name: getattr(args, name) for name in FILTERS}
+            started = time.perf_counter()
+            rows = index.search(args.text, raw=args.raw, limit=args.limit, **filters)
+            total = index.count(args.text, raw=args.raw, **filters)
+            seconds = time.perf_counter() - started
+            if args.json:
+                for row in rows:
+                    print(json.dumps(row, ensure_ascii=False))
+            else:
+                print_results(rows, total, seconds)
+
+        else:
+            for project, statuses in index.summary().items():
+                counts = ", ".join(f"{status}: {n}" for status, n in statuses.items())
+                print(f"{project:<12} {sum(statuses.values()):>7}  ({counts})")
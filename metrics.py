@@ -0,0 +1,234 @@
+import bisect
+import cProfile
+import functools
+import glob
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ---------------------------------------------------------
+# PIPELINE METRICS
+# ---------------------------------------------------------
+# METRICS records one latency histogram per phase (search_page,
+# issue_fetch, html_fetch, transform, write, page_load, each extract_*
+# function...) and plain counters (requests, retries, 429s, 5xx, request
+# exceptions by type, bytes received). At the end of a run it can be
+# dumped as a JSON summary or as a Prometheus text file:
+#   --metrics run.json   or   --metrics run.prom
+# Histograms use fixed log-spaced buckets, so recording is O(log buckets)
+# and memory does not grow with the number of observations. Timings taken
+# inside ProcessDriverPool workers stay in those processes.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)   # upper bounds in seconds
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate, interpolated inside the bucket like Prometheus' histogram_quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets, self.counts):
+            if n and seen + n >= rank:
+                return min(self.max, lower + (bound - lower) * (rank - seen) / n)
+            seen += n
+            lower = bound
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 3),
+            "mean_s": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50_s": round(self.quantile(0.5), 6),
+            "p90_s": round(self.quantile(0.9), 6),
+            "p99_s": round(self.quantile(0.99), 6),
+            "max_s": round(self.max, 6)
+        }
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = Histogram()
+            hist.observe(seconds)
+
+    def merge(self, phase, hist):
+        """Add a Histogram recorded elsewhere (e.g. in a worker process)."""
+        with self._lock:
+            self.phases.setdefault(phase, Histogram()).merge(hist)
+
+    def incr(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    @contextmanager
+    def timer(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def timed(self, phase=None):
+        """Decorator: time every call, under `phase` or the function's name."""
+        def wrap(func):
+            name = phase or func.__name__
+
+            @functools.wraps(func)
+            def inner(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return inner
+        return wrap
+
+    def reset(self):
+        with self._lock:
+            self.phases.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    # --------------------------
+    # Export
+    # --------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "elapsed_s": round(time.time() - self.started, 1),
+                "phases": {name: h.summary() for name, h in sorted(self.phases.items())},
+                "counters": dict(sorted(self.counters.items()))
+            }
+
+    def report(self):
+        snap = self.snapshot()
+        lines = [f"{'phase':<26} {'count':>8} {'mean':>9} {'p50':>8} {'p99':>8} {'max':>8}"]
+        for name, s in snap["phases"].items():
+            lines.append(f"{name:<26} {s['count']:>8} {s['mean_s']:>9} {s['p50_s']:>8} "
+                         f"{s['p99_s']:>8} {s['max_s']:>8}")
+        if snap["counters"]:
+            lines.append("counters: " + ", ".join(f"{k}={v}" for k, v in snap["counters"].items()))
+        return "\n".join(lines)
+
+    def prometheus(self, prefix="jira_scraper"):
+        with self._lock:
+            phases = {name: (h.buckets, list(h.counts), h.count, h.sum)
+                      for name, h in sorted(self.phases.items())}
+            counters = dict(sorted(self.counters.items()))
+
+        lines = [f"# TYPE {prefix}_phase_seconds histogram"]
+        for name, (buckets, counts, count, total) in phases.items():
+            cumulative = 0
+            for bound, n in zip(buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {total:.6f}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {count}')
+
+        for name, value in counters.items():
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the run's metrics to `path`: Prometheus text for .prom, JSON otherwise."""
+        if path.endswith(".prom"):
+            text = self.prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2)
+
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+# shared by every stage of the pipeline
+METRICS = Metrics()
+timed = METRICS.timed
+
+
+# ---------------------------------------------------------
+# OPTIONAL cPROFILE HOOK
+# ---------------------------------------------------------
+# The transform stage runs in worker processes, so each worker keeps its
+# own profiler and dumps it to "<path>.<pid>-<start ms>" after every
+# chunk; merge_profiles() folds those into `path` at the end of the run.
+# Inspect with: python -m pstats <path>
+
+_profiler = None
+_profile_part = None
+
+
+@contextmanager
+def worker_profile(path):
+    """Profile the enclosed block into this process's own part of `path`."""
+    global _profiler, _profile_part
+    if not path:
+        yield
+        return
+
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profile_part = f"{path}.{os.getpid()}-{int(time.time() * 1000)}"
+    _profiler.enable()
+    try:
+        yield
+    finally:
+        _profiler.disable()
+        _profiler.dump_stats(_profile_part)
+
+
+def merge_profiles(path, top=15):
+    """Merge the per-process dumps into `path` and print the `top` functions by cumulative time."""
+    parts = glob.glob(glob.escape(path) + ".*[0-9]")
+    if not parts:
+        return None
+
+    stats = pstats.Stats(*parts)
+    stats.dump_stats(path)
+    for part in parts:
+        os.remove(part)
+
+    print(f"\nProfile of the transform stage → {path}")
+    stats.sort_stats("cumulative").print_stats(top)
+    return path
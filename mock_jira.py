@@ -0,0 +1,385 @@
+import argparse
+import functools
+import gzip
+import html
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# ---------------------------------------------------------
+# LOCAL STAND-IN FOR issues.apache.org
+# ---------------------------------------------------------
+# A threaded HTTP server with just enough of Jira for the scrapers:
+#   /rest/api/2/search       JQL "project = X" (and "updated >= ...", "key > X-n"),
+#                            startAt, maxResults (capped like Jira), fields
+#   /rest/api/2/issue/{key}  the full issue
+#   /jira/browse/{key}       a server-rendered issue page with the markup
+#                            issue_data.py and issue_html.py read
+# Issues are synthetic but deterministic (seeded by key) and of realistic
+# size: wiki markup in descriptions and comments, a few dozen comments on
+# busy issues, and the null custom fields Jira pads every issue with.
+# Every response can be delayed (`latency` ± `jitter` seconds) and a
+# `throttle` fraction of them answered with 429 + Retry-After.
+
+API = "/rest/api/2"
+BROWSE = "/jira/browse"
+EPOCH = datetime(2012, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    "the build fails on trunk when the namenode restarts after a failover and the "
+    "client retries with a stale token so we should move the check into the rpc "
+    "layer patch attached please review test passes locally but the flaky one "
+    "still times out on jenkins region server compaction queue metastore schema "
+    "upgrade leader election session expired znode watcher quorum snapshot"
+).split()
+
+USERS = ["Alice Chen", "Bob Kumar", "Carla Diaz", "Dmitri Ivanov", "Eve Okafor", "Farid Haddad"]
+STATUSES = ["Open", "In Progress", "Patch Available", "Resolved", "Closed"]
+PRIORITIES = ["Blocker", "Critical", "Major", "Minor", "Trivial"]
+TYPES = ["Bug", "Improvement", "New Feature", "Task", "Sub-task"]
+
+
+def jira_time(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def _sentence(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _wiki_text(rng, sentences, project):
+    parts = [_sentence(rng, rng.randint(8, 20)) for _ in range(sentences)]
+    if rng.random() < 0.3:
+        parts.append("{code:java}\nint retries = conf.getInt(\"ipc.retries\", 3);\n{code}")
+    if rng.random() < 0.4:
+        n = rng.randint(1, 9999)
+        parts.append(f"See [{project}-{n}|https://issues.apache.org/jira/browse/{project}-{n}].")
+    if rng.random() < 0.3:
+        parts.append(f"cc [~{rng.choice(USERS).split()[0].lower()}]")
+    return " ".join(parts)
+
+
+def _user(name):
+    login = name.split()[0].lower()
+    return {"name": login, "key": login, "displayName": name, "active": True,
+            "emailAddress": f"{login}@apache.org", "timeZone": "Etc/UTC"}
+
+
+@functools.lru_cache(maxsize=8192)
+def make_issue(project, n, seed=0):
+    """The full REST representation of {project}-{n}, the same on every call."""
+    rng = random.Random(f"{seed}:{project}-{n}")
+    created = EPOCH + timedelta(hours=n * 7 + rng.randint(0, 6))
+    updated = created + timedelta(hours=rng.randint(0, 24 * 400))
+
+    busy = rng.random() < 0.1
+    comments = []
+    for c in range(rng.randint(10, 60) if busy else rng.randint(0, 8)):
+        author = _user(rng.choice(USERS))
+        when = jira_time(created + timedelta(hours=c * 5 + 1))
+        comments.append({
+            "id": str(n * 1000 + c),
+            "author": author,
+            "updateAuthor": author,
+            "body": _wiki_text(rng, rng.randint(1, 6), project),
+            "created": when,
+            "updated": when
+        })
+
+    fields = {
+        "project": {"key": project, "name": project.title(), "id": str(10000 + len(project))},
+        "summary": _sentence(rng, rng.randint(5, 12)).rstrip("."),
+        "description": _wiki_text(rng, rng.randint(2, 15), project),
+        "status": {"name": rng.choice(STATUSES)},
+        "priority": {"name": rng.choice(PRIORITIES)},
+        "issuetype": {"name": rng.choice(TYPES), "subtask": False},
+        "reporter": _user(rng.choice(USERS)),
+        "assignee": _user(rng.choice(USERS)) if rng.random() < 0.7 else None,
+        "labels": rng.sample(["newbie", "performance", "security", "flaky-test", "docs"], rng.randint(0, 2)),
+        "created": jira_time(created),
+        "updated": jira_time(updated),
+        "resolution": None,
+        "fixVersions": [{"name": f"3.{rng.randint(0, 4)}.0"}],
+        "versions": [],
+        "components": [{"name": rng.choice(["ipc", "hdfs", "build", "docs"])}],
+        "watches": {"watchCount": rng.randint(1, 30), "isWatching": False},
+        "votes": {"votes": rng.randint(0, 5), "hasVoted": False},
+        "issuelinks": [],
+        "attachment": [],
+        "worklog": {"startAt": 0, "maxResults": 20, "total": 0, "worklogs": []},
+        "comment": {"comments": comments, "maxResults": len(comments),
+                    "total": len(comments), "startAt": 0},
+    }
+    # Jira pads every issue with the instance's custom fields, mostly null
+    for i in range(60):
+        fields[f"customfield_{12310000 + i}"] = None if i % 6 else f"{rng.random():.6f}"
+
+    return {
+        "expand": "operations,versionedRepresentations,editmeta,changelog,renderedFields",
+        "id": str(100000 + n),
+        "self": f"https://issues.apache.org/jira/rest/api/2/issue/{100000 + n}",
+        "key": f"{project}-{n}",
+        "fields": fields
+    }
+
+
+def project_fields(issue, fields, comment_limit=None):
+    """The issue as a search page returns it for `fields` ("*all", "key" or a comma list)."""
+    out = {k: issue[k] for k in ("expand", "id", "self", "key")}
+    if fields in ("*all", "*navigable"):
+        wanted = issue["fields"]
+    else:
+        names = {f.strip() for f in fields.split(",")} - {"key", "id"}
+        if not names:
+            return out
+        wanted = {k: v for k, v in issue["fields"].items() if k in names}
+    out["fields"] = dict(wanted)
+
+    block = out["fields"].get("comment")
+    if block and comment_limit is not None and len(block["comments"]) > comment_limit:
+        out["fields"]["comment"] = {**block, "comments": block["comments"][:comment_limit],
+                                    "maxResults": comment_limit}
+    return out
+
+
+# ---------------------------------------------------------
+# ISSUE PAGE HTML
+# ---------------------------------------------------------
+
+def _esc(text):
+    return html.escape(text or "")
+
+
+def render_issue_html(issue):
+    f = issue["fields"]
+    key = issue["key"]
+    comments = "".join(
+        f'<div class="activity-item activity-comment"><div class="action-details">'
+        f'<a class="user-hover">{_esc(c["author"]["displayName"])}</a> added a comment - '
+        f'<time datetime="{c["created"]}">{c["created"][:10]}</time></div>'
+        f'<div class="comment-body"><p>{_esc(c["body"])}</p></div></div>'
+        for c in f["comment"]["comments"]
+    ) or "<p>There are no comments yet on this issue.</p>"
+
+    return f"""<!DOCTYPE html>
+<html><head><title>[{key}] {_esc(f["summary"])} - ASF JIRA</title></head>
+<body>
+<a id="key-val" href="/jira/browse/{key}">{key}</a>
+<h1 id="summary-val">{_esc(f["summary"])}</h1>
+<ul id="issuedetails" class="property-list">
+  <li><strong>Type:</strong> <span id="type-val">{_esc(f["issuetype"]["name"])}</span></li>
+  <li><strong>Status:</strong> <span id="status-val">{_esc(f["status"]["name"])}</span></li>
+  <li><strong>Priority:</strong> <span id="priority-val">{_esc(f["priority"]["name"])}</span></li>
+  <li><strong>Resolution:</strong> <span id="resolution-val">Unresolved</span></li>
+  <li><strong>Fix Version/s:</strong> <span id="fixfor-val">{_esc(f["fixVersions"][0]["name"])}</span></li>
+  <li><div id="wrap-labels"><ul class="labels">{"".join(f"<li>{_esc(label)}</li>" for label in f["labels"]) or "None"}</ul></div></li>
+</ul>
+<dl><dd id="assignee-val">{_esc((f["assignee"] or {}).get("displayName", "Unassigned"))}</dd>
+<dd id="reporter-val">{_esc(f["reporter"]["displayName"])}</dd>
+<aui-badge id="vote-data">{f["votes"]["votes"]}</aui-badge>
+<aui-badge id="watcher-data">{f["watches"]["watchCount"]}</aui-badge></dl>
+<dl><dd id="created-val"><time datetime="{f["created"]}">{f["created"][:10]}</time></dd>
+<dd id="updated-val"><time datetime="{f["updated"]}">{f["updated"][:10]}</time></dd></dl>
+<div id="descriptionmodule"><div class="user-content-block"><p>{_esc(f["description"])}</p></div></div>
+<ul class="tabs"><li id="comment-tabpanel" class="menu-item active"><a href="#">Comments</a></li></ul>
+<div id="issue_actions_container">{comments}</div>
+</body></html>
+"""
+
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+
+class MockJira:
+    """
+    Serve `projects` ({key: issue count}) on 127.0.0.1:`port` (0 = any free port)
+    from a background thread. Use as a context manager, or start()/stop().
+    """
+
+    def __init__(self, projects=None, latency=0.0, jitter=0.0, throttle=0.0, retry_after=1,
+                 max_results=100, search_comments=20, gzip_level=1, seed=0, port=0):
+        self.projects = projects or {"MOCK": 1000}
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.max_results = max_results
+        self.search_comments = search_comments
+        self.gzip_level = gzip_level
+        self.seed = seed
+        self.port = port
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.stats = {"requests": 0, "throttled": 0, "bytes_sent": 0}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def rest_url(self):
+        return self.url + API
+
+    def browse_url(self, key):
+        return f"{self.url}{BROWSE}/{key}"
+
+    def keys(self, project):
+        return [f"{project}-{n}" for n in range(1, self.projects[project] + 1)]
+
+    # --------------------------
+    # Request handling
+    # --------------------------
+    def _delay_and_throttle(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) if self.latency else 0.0
+            throttled = self._rng.random() < self.throttle
+            if throttled:
+                self.stats["throttled"] += 1
+        if delay:
+            time.sleep(delay)
+        return throttled
+
+    def _issue(self, key):
+        project, _, n = key.rpartition("-")
+        if project not in self.projects or not n.isdigit() or not 1 <= int(n) <= self.projects[project]:
+            return None
+        return make_issue(project, int(n), self.seed)
+
+    def search(self, query):
+        jql = query.get("jql", [""])[0]
+        match = re.search(r'project\s*=\s*"?([A-Z][A-Z0-9_]*)"?', jql)
+        project = match.group(1) if match else None
+        if project not in self.projects:
+            return 400, {"errorMessages": [f"The value '{project}' does not exist for the field 'project'."]}
+
+        start_at = int(query.get("startAt", ["0"])[0])
+        max_results = min(int(query.get("maxResults", ["50"])[0]), self.max_results)
+        fields = query.get("fields", ["*navigable"])[0]
+        if fields == "key":
+            max_results = min(int(query.get("maxResults", ["50"])[0]), 1000)
+
+        numbers = range(1, self.projects[project] + 1)
+        since = re.search(r'updated\s*>=\s*"([^"]+)"', jql)
+        if since:
+            moment = datetime.strptime(since.group(1).replace("/", "-"), "%Y-%m-%d %H:%M")
+            cutoff = jira_time(moment.replace(tzinfo=timezone.utc))
+            matching = [make_issue(project, n, self.seed) for n in numbers]
+            matching = [i for i in matching if i["fields"]["updated"] >= cutoff]
+            after = re.search(r'key\s*>\s*[A-Z][A-Z0-9_]*-(\d+)', jql)
+            if after:
+                matching = [i for i in matching if int(i["key"].rpartition("-")[2]) > int(after.group(1))]
+            if "ORDER BY key" not in jql:
+                matching.sort(key=lambda i: i["fields"]["updated"])
+            total = len(matching)
+            page = matching[start_at:start_at + max_results]
+        else:
+            total = len(numbers)
+            page = [make_issue(project, n, self.seed) for n in numbers[start_at:start_at + max_results]]
+
+        return 200, {
+            "expand": "names,schema",
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": total,
+            "issues": [project_fields(i, fields, self.search_comments) for i in page]
+        }
+
+    def handle(self, handler):
+        url = urlparse(handler.path)
+
+        if self._delay_and_throttle():
+            return 429, "application/json", b'{"errorMessages":["Rate limit exceeded"]}', \
+                {"Retry-After": str(self.retry_after)}
+
+        if url.path == f"{API}/search":
+            status, body = self.search(parse_qs(url.query))
+            return status, "application/json", json.dumps(body).encode("utf8"), {}
+
+        if url.path.startswith(f"{API}/issue/"):
+            issue = self._issue(url.path.rsplit("/", 1)[1])
+            if issue is None:
+                return 404, "application/json", b'{"errorMessages":["Issue Does Not Exist"]}', {}
+            return 200, "application/json", json.dumps(issue).encode("utf8"), {}
+
+        if url.path.startswith(f"{BROWSE}/"):
+            issue = self._issue(url.path.rsplit("/", 1)[1])
+            if issue is None:
+                return 404, "text/html", b"<html><body>Issue Does Not Exist</body></html>", {}
+            return 200, "text/html;charset=UTF-8", render_issue_html(issue).encode("utf8"), {}
+
+        return 404, "text/plain", b"not found", {}
+
+    # --------------------------
+    # Lifecycle
+    # --------------------------
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, ctype, body, headers = mock.handle(self)
+                if mock.gzip_level and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, mock.gzip_level)
+                    headers = {**headers, "Content-Encoding": "gzip"}
+
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with mock._lock:
+                    mock.stats["bytes_sent"] += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Apache Jira")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--issues", type=int, default=1000, help="issues per project")
+    parser.add_argument("--projects", default="MOCK", help="comma-separated project keys")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay, seconds")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fraction of requests answered 429")
+    args = parser.parse_args()
+
+    projects = {p.strip().upper(): args.issues for p in args.projects.split(",") if p.strip()}
+    with MockJira(projects, latency=args.latency, jitter=args.latency / 4,
+                  throttle=args.throttle, port=args.port) as mock:
+        print(f"Mock Jira on {mock.url}  (REST: {mock.rest_url}, pages: {mock.url}{BROWSE}/KEY)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
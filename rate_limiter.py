@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+
+
+# ---------------------------------------------------------
+# ADAPTIVE RATE LIMITER
+# ---------------------------------------------------------
+# One token bucket for everything that talks to issues.apache.org, REST
+# calls and browser page loads alike. The refill rate adapts AIMD-style:
+#   - healthy responses add `increase` req/s per second (up to max_rate):
+#     each one adds increase / rate, and about `rate` of them arrive a second
+#   - a slow response trims the rate by 10%, at most once per slow_window
+#     seconds (or one baseline round trip, if longer). Slow means above
+#     latency_factor × the EWMA latency of its phase: a 100-issue search
+#     page and a single issue fetch have very different normal latencies,
+#     and a healthy server is only ever compared against itself
+#   - a 429 multiplies it by `decrease` and pauses every caller for the
+#     server's Retry-After (or a jittered backoff when there is none)
+# After `breaker_threshold` consecutive failures the circuit breaker opens
+# and nobody is let through for `breaker_cooldown` seconds; after that a
+# single further failure re-opens it, a success closes it.
+
+class RateLimiter:
+
+    def __init__(self, rate=10.0, burst=10, min_rate=0.2, max_rate=100.0,
+                 increase=0.5, decrease=0.5, latency_factor=2.0, latency_alpha=0.1,
+                 slow_window=5.0, breaker_threshold=8, breaker_cooldown=60.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_alpha = latency_alpha
+        self.slow_window = slow_window
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._open_until = 0.0
+        self._failures = 0
+        self._baseline = {}   # phase → EWMA latency in seconds
+        self._slowed_at = 0.0
+
+        self.stats = {
+            "acquired": 0,
+            "throttled": 0,
+            "errors": 0,
+            "breaker_trips": 0,
+            "waited_s": 0.0
+        }
+
+    # --------------------------
+    # Token bucket
+    # --------------------------
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                hold = max(self._paused_until, self._open_until) - now
+
+                if hold <= 0:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.stats["acquired"] += 1
+                        self.stats["waited_s"] += waited
+                        return
+                    hold = (1 - self._tokens) / self.rate
+
+            time.sleep(hold)
+            waited += hold
+
+    # --------------------------
+    # Feedback
+    # --------------------------
+    def on_success(self, latency=None, phase=None):
+        with self._lock:
+            self._failures = 0
+            if latency is not None and self._slow(latency, phase):
+                now = time.monotonic()
+                if now - self._slowed_at >= max(self.slow_window, self._baseline[phase]):
+                    self._slowed_at = now
+                    self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+            if latency is not None:
+                self._track(latency, phase)
+
+    def _slow(self, latency, phase):
+        base = self._baseline.get(phase)
+        return base is not None and latency > self.latency_factor * base
+
+    def _track(self, latency, phase):
+        base = self._baseline.get(phase)
+        self._baseline[phase] = latency if base is None else \
+            base + self.latency_alpha * (latency - base)
+
+    def on_throttle(self, retry_after=None, attempt=0):
+        with self._lock:
+            self.stats["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = 0.0
+
+            pause = retry_after if retry_after is not None else self.backoff(attempt)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def on_error(self):
+        with self._lock:
+            self.stats["errors"] += 1
+            self._failures += 1
+
+            if self._failures >= self.breaker_threshold:
+                self.stats["breaker_trips"] += 1
+                self._open_until = time.monotonic() + self.breaker_cooldown
+                # half-open: the next failure trips the breaker again
+                self._failures = self.breaker_threshold - 1
+
+    @staticmethod
+    def backoff(attempt, base=1.0, cap=60.0):
+        """Exponential backoff with jitter: a random delay in [d/2, d]."""
+        delay = min(cap, base * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    # --------------------------
+    # Helpers
+    # --------------------------
+    def share(self, fraction):
+        """Scale the budget down to `fraction` (for one of several worker processes)."""
+        with self._lock:
+            self.rate *= fraction
+            self.min_rate *= fraction
+            self.max_rate *= fraction
+            self.burst = max(1, int(self.burst * fraction))
+            self._tokens = min(self._tokens, self.burst)
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self.stats,
+                "waited_s": round(self.stats["waited_s"], 1),
+                "rate": round(self.rate, 2),
+                "breaker_open": self._open_until > now,
+                "paused": self._paused_until > now
+            }
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header, or None if missing or a date."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# shared by scraper.py, issue_html.py and the browser pools
+LIMITER = RateLimiter()
@@ -0,0 +1,215 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# ---------------------------------------------------------
+# MULTI-PROJECT SCHEDULER
+# ---------------------------------------------------------
+# run_projects() crawls several projects at the same time, so a slow or
+# throttled project no longer holds up the others. They all share the one
+# LIMITER (rate_limiter.py) and the SLOTS budget of HTTP requests in
+# flight. When slots run short, the next free slot goes to the waiting
+# project that holds the fewest at that moment, so a big project cannot
+# starve a small one. BOARD tracks done/total per project, and
+# run_projects prints it as a table with rates and ETAs every few seconds.
+
+GLOBAL_SLOTS = 16   # HTTP requests in flight across all projects
+PROGRESS_INTERVAL = 10   # seconds between progress tables
+
+
+class FairSlots:
+    """Counting semaphore that hands free slots to the least-served project first."""
+
+    def __init__(self, size=GLOBAL_SLOTS):
+        self.size = size
+        self._cond = threading.Condition()
+        self._used = 0
+        self._in_use = {}
+        self._waiting = []   # (project, ticket), in arrival order
+        self._tickets = 0
+        self.stats = {"granted": 0, "waited": 0}
+
+    def _next(self):
+        return min(self._waiting, key=lambda w: (self._in_use.get(w[0], 0), w[1]))
+
+    def acquire(self, project=None):
+        with self._cond:
+            self._tickets += 1
+            me = (project, self._tickets)
+            self._waiting.append(me)
+
+            waited = False
+            while self._used >= self.size or self._next() != me:
+                waited = True
+                self._cond.wait()
+
+            self._waiting.remove(me)
+            self._used += 1
+            self._in_use[project] = self._in_use.get(project, 0) + 1
+            self.stats["granted"] += 1
+            self.stats["waited"] += waited
+            # another slot may still be free for the next waiter
+            self._cond.notify_all()
+
+    def release(self, project=None):
+        with self._cond:
+            self._used -= 1
+            self._in_use[project] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, project=None):
+        self.acquire(project)
+        try:
+            yield
+        finally:
+            self.release(project)
+
+    def resize(self, size):
+        with self._cond:
+            self.size = size
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {**self.stats, "size": self.size, "in_use": self._used}
+
+
+# ---------------------------------------------------------
+# PROGRESS BOARD
+# ---------------------------------------------------------
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class ProgressBoard:
+    """Per-project done/failed/total counters; the rate only counts this run's work."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+
+    def _row(self, project):
+        return self._rows.setdefault(project, {
+            "state": "queued", "total": None, "done": 0, "failed": 0,
+            "base": 0, "started": None, "finished": None
+        })
+
+    def queue(self, project):
+        with self._lock:
+            self._row(project)
+
+    def start(self, project, total=None, done=0):
+        with self._lock:
+            row = self._row(project)
+            row.update(state="running", total=total, done=done, failed=0, base=done,
+                       started=time.monotonic(), finished=None)
+
+    def set_total(self, project, total):
+        with self._lock:
+            self._row(project)["total"] = total
+
+    def advance(self, project, n=1):
+        with self._lock:
+            self._row(project)["done"] += n
+
+    def fail(self, project, n=1):
+        with self._lock:
+            self._row(project)["failed"] += n
+
+    def finish(self, project, state="done"):
+        with self._lock:
+            row = self._row(project)
+            row["state"] = state
+            row["finished"] = time.monotonic()
+
+    def snapshot(self):
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for project, row in self._rows.items():
+                elapsed = ((row["finished"] or now) - row["started"]) if row["started"] else 0
+                rate = (row["done"] - row["base"]) / elapsed if elapsed > 0 else 0.0
+                left = row["total"] - row["done"] if row["total"] is not None else None
+
+                eta = None
+                if row["state"] != "running":
+                    eta = 0 if row["state"] == "done" else None
+                elif left is not None and rate > 0:
+                    eta = max(0, left) / rate
+
+                out[project] = {
+                    "state": row["state"],
+                    "done": row["done"],
+                    "failed": row["failed"],
+                    "total": row["total"],
+                    "rate": round(rate, 2),
+                    "eta_s": None if eta is None else round(eta)
+                }
+        return out
+
+    def render(self):
+        lines = [f"{'project':<12} {'state':<8} {'done':>15} {'failed':>7} {'issues/s':>9} {'ETA':>8}"]
+        for project, row in self.snapshot().items():
+            count = f"{row['done']}/{'?' if row['total'] is None else row['total']}"
+            lines.append(f"{project:<12} {row['state']:<8} {count:>15} "
+                         f"{row['failed']:>7} {row['rate']:>9} {format_eta(row['eta_s']):>8}")
+        return "\n".join(lines)
+
+
+# shared by scraper.py and selenium_scraper.py
+SLOTS = FairSlots()
+BOARD = ProgressBoard()
+
+
+# ---------------------------------------------------------
+# RUNNER
+# ---------------------------------------------------------
+
+def run_projects(projects, job, parallel=None, interval=PROGRESS_INTERVAL, slots=None):
+    """
+    Run job(project) for every project, `parallel` of them at a time (default:
+    all at once), printing BOARD every `interval` seconds while they run.
+    `slots`, if given, resizes SLOTS before the first job starts.
+
+    Returns {project: result}; a job that raised has the exception as its result.
+    """
+    results = {}
+    stop = threading.Event()
+    if slots is not None:
+        SLOTS.resize(slots)
+
+    for project in projects:
+        BOARD.queue(project)
+
+    def report():
+        while not stop.wait(interval):
+            print("\n" + BOARD.render() + "\n", flush=True)
+
+    def run(project):
+        try:
+            results[project] = job(project)
+            BOARD.finish(project)
+        except Exception as exc:
+            print(f"\n❌ {project} failed: {exc!r}")
+            results[project] = exc
+            BOARD.finish(project, "failed")
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=parallel or len(projects) or 1) as pool:
+            list(pool.map(run, projects))
+    finally:
+        stop.set()
+
+    print("\n" + BOARD.render())
+    return results
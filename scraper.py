@@ -1,45 +1,251 @@
 import time
 import json
-import re
+import os
+import argparse
+import atexit
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from checkpoint import load_checkpoint, save_checkpoint, truncate_output
+from rate_limiter import LIMITER, parse_retry_after
+from http_cache import ResponseCache, cache_key, CACHE_PATH, CACHE_TTL
+from text_clean import clean_text, first_sentence, text_head
+from scheduler import BOARD, GLOBAL_SLOTS, SLOTS, run_projects
+from metrics import METRICS, Histogram, merge_profiles, worker_profile
+from issue_index import INDEX_PATH, IssueIndex
 
 BASE_URL = "https://issues.apache.org/jira/rest/api/2"
-PAGE_SIZE = 50
+PAGE_SIZE = 100   # issues per search page asked for; the server may cap it lower
 MAX_RETRIES = 5
+MAX_WORKERS = 8   # requests in flight at once per project (page prefetch + refetches)
+POOL_SIZE = GLOBAL_SLOTS   # keep-alive connections kept open per host (at least SLOTS.size)
+KEEP_ALIVE = True
+WRITE_BATCH = 200   # issues buffered before each JSONL flush
+SYNC_OVERLAP_MINUTES = 24 * 60   # re-read window before the watermark (JQL has no timezone)
+
+# counters for the search-only ingestion mode
+FETCH_STATS = {
+    "refetches": 0,
+    "refetches_avoided": 0,
+    "bytes_saved_estimate": 0   # extrapolated from probe_field_savings, not measured
+}
+_fetch_stats_lock = threading.Lock()   # projects run on threads of their own
+
+
+def count_fetch(name, n=1):
+    with _fetch_stats_lock:
+        FETCH_STATS[name] += n
 
 HEADERS = {
     "Accept": "application/json",
-    "User-Agent": "Apache-Jira-Scraper/1.0"
+    "User-Agent": "Apache-Jira-Scraper/1.0",
+    "Accept-Encoding": "gzip, deflate"
 }
 
+# ---------------------------------------------------------
+# SHARED SESSION (CONNECTION POOL)
+# ---------------------------------------------------------
+
+_session = None
+_session_pool = 0
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Module-wide keep-alive session, built on first use from POOL_SIZE/KEEP_ALIVE.
+
+    Its pool holds at least SLOTS.size connections, so it is rebuilt when
+    SLOTS has grown since (e.g. run_projects(..., slots=N)).
+    """
+    global _session, _session_pool
+    size = max(POOL_SIZE, SLOTS.size)
+    with _session_lock:
+        if _session is not None and _session_pool < size:
+            # outgrown: closing only drops idle connections, requests still
+            # on the wire finish and their connection is closed when returned
+            _session.close()
+            _session = None
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.headers["Connection"] = "keep-alive" if KEEP_ALIVE else "close"
+
+            adapter = HTTPAdapter(pool_maxsize=size, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session, _session_pool = session, size
+    return _session
+
+
+def session_stats():
+    """Connection reuse counters summed over every host pool of the shared session."""
+    stats = {"requests": 0, "handshakes": 0, "reused": 0}
+    session = _session
+    if session is None:
+        return stats
+
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["handshakes"] += pool.num_connections
+
+    stats["reused"] = max(stats["requests"] - stats["handshakes"], 0)
+    return stats
+
+
+# ---------------------------------------------------------
+# RESPONSE CACHE
+# ---------------------------------------------------------
+# Off unless enable_cache() is called. With a cache, fresh entries are
+# served without a request and stale ones are revalidated conditionally;
+# offline=True never touches the network and misses return None.
+
+CACHE = None
+OFFLINE = False
+
+
+def enable_cache(path=CACHE_PATH, ttl=CACHE_TTL, offline=False):
+    global CACHE, OFFLINE
+    CACHE = ResponseCache(path, ttl=ttl)
+    atexit.register(CACHE.close)   # writes the batched last_used updates
+    OFFLINE = offline
+    return CACHE
+
+
+def is_offline():
+    return OFFLINE
+
+
+def _decode(text, as_text):
+    return text if as_text else json.loads(text)
+
+
+def _decode_cached(cached, as_text):
+    """The decoded cached body, or None (and the entry discarded) if it does not decode."""
+    try:
+        return _decode(cached.text, as_text)
+    except ValueError:
+        METRICS.incr("cache_undecodable")
+        CACHE.discard(cached.key)
+        return None
+
+
 # ---------------------------------------------------------
 # BASIC HTTP + RETRY LAYER
 # ---------------------------------------------------------
+# Every request goes through the shared LIMITER (rate_limiter.py): it is
+# paced by the token bucket, a 429 slows down and pauses every worker, and
+# failures back off exponentially with jitter. While it is on the wire it
+# also holds one of the scheduler's SLOTS, charged to `project`. Each
+# attempt's latency is recorded in METRICS under `phase`, along with
+# retries, 429/5xx answers, request exceptions and bytes received.
+# A body is only cached once it has decoded, so a 200 maintenance page is
+# retried like a 5xx rather than stored; a cached body that no longer
+# decodes is discarded and fetched again.
+
+def project_of(key):
+    return key.rsplit("-", 1)[0]
+
+
+def get_with_retry(url, params=None, headers=None, as_text=False, project=None, phase="http"):
+    """HTTP GET with retries and 429/5xx handling; JSON body, or text with as_text."""
+    cached = None
+    headers = dict(headers or {})
+
+    if CACHE is not None:
+        key = cache_key(url, params, headers.get("Accept"))
+        cached = CACHE.lookup(key)
+
+        if cached is not None and (OFFLINE or CACHE.is_fresh(cached)):
+            data = _decode_cached(cached, as_text)
+            if data is not None:
+                CACHE.hit(cached)
+                METRICS.incr("cache_hits")
+                return data
+            cached = None
+        if OFFLINE:
+            CACHE.miss()
+            return None
+        if cached is not None:
+            headers.update(cached.validators())
 
-def get_with_retry(url, params=None):
-    """HTTP GET with retries and 429/5xx handling."""
     for attempt in range(MAX_RETRIES):
+        METRICS.incr("requests")
+        if attempt:
+            METRICS.incr("retries")
         try:
-            resp = requests.get(url, headers=HEADERS, params=params, timeout=20)
+            with SLOTS.slot(project):
+                LIMITER.acquire()
+                started = time.monotonic()
+                resp = get_session().get(url, params=params, headers=headers, timeout=20)
+                body = resp.content
+            latency = time.monotonic() - started
+
+            METRICS.observe(phase, latency)
+            METRICS.incr(f"http_{resp.status_code}")
+            METRICS.incr("bytes_received", len(body))
+            if resp.raw is not None and resp.raw.tell():
+                METRICS.incr("bytes_on_wire", resp.raw.tell())
+
+            if resp.status_code == 304 and cached is not None:
+                LIMITER.on_success(latency, phase)
+                data = _decode_cached(cached, as_text)
+                if data is not None:
+                    CACHE.revalidated(cached)
+                    return data
+                # ask again without validators, for a full body
+                cached = None
+                headers.pop("If-None-Match", None)
+                headers.pop("If-Modified-Since", None)
+                continue
 
             if resp.status_code == 200:
-                return resp.json()
+                try:
+                    data = resp.text if as_text else resp.json()
+                except ValueError:   # e.g. an HTML maintenance page served as 200
+                    METRICS.incr("http_200_undecodable")
+                    LIMITER.on_error()
+                    time.sleep(LIMITER.backoff(attempt))
+                    continue
+
+                LIMITER.on_success(latency, phase)
+                if CACHE is not None:
+                    CACHE.miss()
+                    CACHE.store(key, url, body, resp.encoding,
+                                resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                return data
 
             if resp.status_code == 429:  # rate limit
-                wait = int(resp.headers.get("Retry-After", 2))
-                time.sleep(wait)
+                LIMITER.on_throttle(parse_retry_after(resp.headers.get("Retry-After")), attempt)
                 continue
 
             if 500 <= resp.status_code < 600:
-                time.sleep(1 + attempt)
+                LIMITER.on_error()
+                time.sleep(LIMITER.backoff(attempt))
                 continue
 
             # any other client error → return None
+            LIMITER.on_success(latency, phase)
             return None
 
-        except requests.exceptions.RequestException:
-            time.sleep(1 + attempt)
+        except requests.exceptions.RequestException as exc:
+            METRICS.incr(f"error_{type(exc).__name__}")
+            LIMITER.on_error()
+            time.sleep(LIMITER.backoff(attempt))
 
+    METRICS.incr("gave_up")
     return None
 
 
@@ -47,34 +253,79 @@ def get_with_retry(url, params=None):
 # SCRAPER FUNCTIONS
 # ---------------------------------------------------------
 
-def search_issues(project_key, start_at=0, max_results=50):
+def search_issues(project_key, start_at=0, max_results=50, updated_since=None, fields=None,
+                  after_key=None):
     url = f"{BASE_URL}/search"
-    jql = f"project = {project_key} ORDER BY created ASC"
+    if updated_since:
+        after = f" AND key > {after_key}" if after_key else ""
+        jql = f'project = {project_key} AND updated >= "{updated_since}"{after} ORDER BY key ASC'
+    else:
+        jql = f"project = {project_key} ORDER BY created ASC"
     params = {
         "jql": jql,
         "startAt": start_at,
         "maxResults": max_results,
-        "fields": "*all"
+        "fields": fields or SEARCH_FIELDS
     }
-    return get_with_retry(url, params=params)
+    return get_with_retry(url, params=params, project=project_key, phase="search_page")
 
 
-def fetch_single_issue(key):
+def fetch_single_issue(key, fields=None):
     url = f"{BASE_URL}/issue/{key}"
-    return get_with_retry(url)
+    return get_with_retry(url, params={"fields": fields or SEARCH_FIELDS}, project=project_of(key),
+                          phase="issue_fetch")
 
 
 # ---------------------------------------------------------
-# TRANSFORMATION LAYER (LLM FORMAT)
+# FIELD PROJECTION
 # ---------------------------------------------------------
+# When a crawl transforms what it fetches, search pages and single-issue
+# fetches only ask for TRANSFORM_FIELDS, the fields transform_issue reads,
+# instead of every custom field on the instance. Raw dumps (`fetch`,
+# keep_raw=True) always ask for ALL_FIELDS, so a later transform can use
+# fields the current one does not. probe_field_savings() fetches a few
+# issues both ways before a full crawl to show what projection saves; that
+# per-issue figure is extrapolated into FETCH_STATS["bytes_saved_estimate"]
+# for every search page walked afterwards. --all-fields turns projection
+# off everywhere.
 
-def clean_text(x):
-    if not x:
-        return ""
-    x = re.sub(r"<[^>]+>", " ", x)
-    x = re.sub(r"\s+", " ", x)
-    return x.strip()
+# every field transform_issue reads, keep in sync with it
+TRANSFORM_FIELDS = (
+    "project", "summary", "status", "priority", "issuetype", "reporter",
+    "assignee", "labels", "created", "updated", "description", "comment"
+)
+SEARCH_FIELDS = ",".join(TRANSFORM_FIELDS)
+ALL_FIELDS = "*all"
+
+FIELD_SAVINGS = {}   # project → bytes saved per issue
+
+
+def probe_field_savings(project_key, sample=10):
+    """Compare one small search page with *all and with SEARCH_FIELDS; returns bytes saved per issue."""
+    if SEARCH_FIELDS == ALL_FIELDS:
+        return 0
+
+    full = search_issues(project_key, max_results=sample, fields=ALL_FIELDS)
+    slim = search_issues(project_key, max_results=sample)
+    if not full or not slim or not full.get("issues"):
+        return 0
+
+    full_bytes = len(json.dumps(full["issues"], separators=(",", ":")))
+    slim_bytes = len(json.dumps(slim["issues"], separators=(",", ":")))
+    per_issue = (full_bytes - slim_bytes) // len(full["issues"])
+    FIELD_SAVINGS[project_key] = per_issue
 
+    page = per_issue * PAGE_SIZE
+    print(f"Field projection on {project_key}: {full_bytes // len(full['issues'])} → "
+          f"{slim_bytes // len(slim['issues'])} bytes per issue, "
+          f"~{page / 1024:.0f} KB saved per page of {PAGE_SIZE} "
+          f"(x{full_bytes / max(slim_bytes, 1):.1f} smaller)")
+    return per_issue
+
+
+# ---------------------------------------------------------
+# TRANSFORMATION LAYER (LLM FORMAT)
+# ---------------------------------------------------------
 
 def extract_comments(fields):
     comments = []
@@ -114,7 +365,7 @@ def generate_qna(issue):
         })
 
     if desc:
-        sent = re.split(r"[.!?]", desc)[0]
+        sent = first_sentence(desc)
         qna.append({
             "question": "What details are provided in the issue description?",
             "answer": sent.strip()
@@ -123,7 +374,20 @@ def generate_qna(issue):
     return qna
 
 
+def blob_parts(issue):
+    """Title, description and comment bodies, as pieces of the summary text blob."""
+    yield issue["title"]
+    yield "\n\n"
+    yield issue["description"]
+    yield "\n\n"
+    for i, c in enumerate(issue["comments"]):
+        if i:
+            yield " "
+        yield c["body"]
+
+
 def transform_issue(raw):
+    """Raw REST issue → dataset record; reads only the TRANSFORM_FIELDS."""
     fields = raw.get("fields", {})
 
     issue = {
@@ -145,15 +409,8 @@ def transform_issue(raw):
         "comments": extract_comments(fields)
     }
 
-    # text blob for summary
-    blob = (
-        issue["title"] + "\n\n" +
-        issue["description"] + "\n\n" +
-        " ".join([c["body"] for c in issue["comments"]])
-    ).strip()
-
     issue["derived"] = {
-        "summary": summarize(blob),
+        "summary": summarize(text_head(blob_parts(issue), 300)),
         "classification": {
             "priority": issue["priority"],
             "type": issue["type"],
@@ -169,36 +426,548 @@ def transform_issue(raw):
 # MAIN SCRAPER LOOP
 # ---------------------------------------------------------
 
-def scrape_project(project_key, limit=None):
-    all_issues = []
-    start_at = 0
+def is_truncated(raw):
+    """True when a search-page issue does not carry its full comment list."""
+    fields = raw.get("fields")
+    if not fields or "comment" not in fields:
+        return True
+
+    cblock = fields.get("comment") or {}
+    comments = cblock.get("comments", [])
+    return cblock.get("total", len(comments)) > len(comments)
+
+
+def iter_search_pages(project_key, pool, window=MAX_WORKERS, start_at=0, updated_since=None,
+                      fields=None):
+    """
+    Yield (start_at, page) for the search pages of a project, in order.
+
+    Up to `window` pages are fetched ahead on `pool` while the caller is
+    still transforming the current one. A page that could not be fetched
+    is yielded as None and ends the walk. Pages of PAGE_SIZE are asked
+    for; when the server caps that lower, its maxResults is used instead.
+    With `updated_since` the walk is handed to iter_changed_pages.
+    """
+    if updated_since:
+        yield from iter_changed_pages(project_key, updated_since, start_at, fields)
+        return
+
+    first = search_issues(project_key, start_at=start_at, max_results=PAGE_SIZE,
+                          updated_since=updated_since, fields=fields)
+    if not first or not first.get("issues"):
+        if first is None:
+            yield start_at, None
+        return
+    yield start_at, first
+
+    page_size = min(PAGE_SIZE, first.get("maxResults") or PAGE_SIZE)
+    offsets = iter(range(start_at + page_size, first.get("total", 0), page_size))
+    in_flight = deque()
+
+    def submit_next():
+        offset = next(offsets, None)
+        if offset is not None:
+            in_flight.append((offset, pool.submit(search_issues, project_key, offset,
+                                                  page_size, updated_since, fields)))
+
+    for _ in range(window):
+        submit_next()
 
+    try:
+        while in_flight:
+            offset, fut = in_flight.popleft()
+            page = fut.result()
+            submit_next()
+
+            if page is None:
+                yield offset, None
+                break
+            if not page.get("issues"):
+                break
+            yield offset, page
+    finally:
+        for _, fut in in_flight:
+            fut.cancel()
+
+
+def iter_changed_pages(project_key, updated_since, start_at=0, fields=None):
+    """
+    Yield (position, page) for the issues updated since `updated_since`, by key.
+
+    Each page asks for keys after the last one of the previous page instead
+    of a startAt offset: an issue updated mid-walk would move to the end of
+    an `updated`-ordered result and shift every later offset, skipping an
+    issue. Keys do not move, so such an issue is at worst read twice. That
+    also means one page at a time, with no prefetch. Each page's total is
+    rewritten to count the pages already yielded as well.
+    """
+    position, after_key = start_at, None
     while True:
-        page = search_issues(project_key, start_at=start_at, max_results=PAGE_SIZE)
-        if not page:
-            break
+        page = search_issues(project_key, max_results=PAGE_SIZE, updated_since=updated_since,
+                             fields=fields, after_key=after_key)
+        if page is None:
+            yield position, None
+            return
+        if not page.get("issues"):
+            return
+
+        page["total"] = position + page.get("total", len(page["issues"]))
+        yield position, page
+        position += len(page["issues"])
+        after_key = page["issues"][-1]["key"]
+
+
+def resolve_page_issues(items, pool, search_only=True, fields=None):
+    """
+    Return (key, raw) for the issues of one search page, in page order.
+
+    Issues that have to be refetched are fetched concurrently on `pool`;
+    raw is None when a refetch failed.
+    """
+    resolved = []
+    for item in items:
+        if search_only and not is_truncated(item):
+            resolved.append(item)
+            count_fetch("refetches_avoided")
+        else:
+            resolved.append(pool.submit(fetch_single_issue, item["key"], fields))
+            count_fetch("refetches")
+
+    return [
+        (item["key"], r.result() if isinstance(r, Future) else r)
+        for item, r in zip(items, resolved)
+    ]
+
+
+def iter_raw_issues(project_key, limit=None, search_only=True, workers=MAX_WORKERS,
+                    start_at=0, skip_keys=None, progress=None, updated_since=None, fields=None):
+    """
+    Walk the search pages of a project and yield every raw REST issue.
 
-        issues = page.get("issues", [])
-        total = page.get("total", 0)
+    With search_only=True the issues embedded in each search page are
+    transformed directly; an issue is refetched individually only when
+    its search payload is truncated (e.g. paginated comments).
 
-        if not issues:
-            break
+    HTTP work runs on a pool of `workers` threads; output order follows
+    the search order (created ASC) no matter which request finishes first.
+    Only the pages in the prefetch window are held in memory.
+
+    The walk starts at `start_at` and leaves out keys in `skip_keys`.
+    With `updated_since` (a JQL date) only issues updated since then are
+    walked, in key order (see iter_changed_pages). `fields` overrides
+    SEARCH_FIELDS.
+    If a `progress` dict is given it is kept up to date with the cursor of
+    the page being yielded ("start_at"), keys whose fetch failed
+    ("failed_keys") and the cursor of a search page that failed ("failed_at").
+    """
+    produced = 0
+    skip_keys = skip_keys if skip_keys is not None else set()
+    progress = progress if progress is not None else {}
+    progress.setdefault("failed_keys", [])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = iter_search_pages(project_key, pool, window=workers, start_at=start_at,
+                                  updated_since=updated_since, fields=fields)
+        with closing(pages):
+            for offset, page in pages:
+                if page is None:
+                    progress["failed_at"] = offset
+                    return
+
+                progress["start_at"] = offset
+                BOARD.set_total(project_key, page.get("total"))
+                if fields is None:
+                    count_fetch("bytes_saved_estimate", FIELD_SAVINGS.get(project_key, 0) * len(page["issues"]))
+                items = [i for i in page["issues"] if i["key"] not in skip_keys]
+
+                for key, raw in resolve_page_issues(items, pool, search_only, fields):
+                    if raw:
+                        yield raw
+                        produced += 1
+                    else:
+                        progress["failed_keys"].append(key)
+                        BOARD.fail(project_key)
+
+                    if limit and produced >= limit:
+                        return
+
+
+def scrape_project(project_key, **options):
+    """iter_raw_issues(project_key, **options), transformed for the LLM dataset."""
+    for raw in iter_raw_issues(project_key, **options):
+        with METRICS.timer("transform"):
+            issue = transform_issue(raw)
+        yield issue
+
+
+# ---------------------------------------------------------
+# CHECKPOINTED CRAWL
+# ---------------------------------------------------------
 
-        for item in issues:
-            key = item["key"]
-            raw = fetch_single_issue(key)
+def checkpoint_path(out_file):
+    return os.path.splitext(out_file)[0] + ".checkpoint.json"
+
+
+def crawl_project(project_key, out_file, resume=False, limit=None, keep_raw=False, index=None):
+    """
+    Scrape a project into `out_file`, checkpointing after every flush.
+    With keep_raw=True the raw REST issues are written, untransformed.
+    Transformed issues are also upserted into `index` (an IssueIndex), if
+    given, which is committed along with each checkpoint.
+
+    With resume=True an existing checkpoint is picked up: the output is cut
+    back to its last checkpointed size, keys that failed last time are
+    retried, and the search continues from the saved cursor while skipping
+    keys that are already written. Returns the number of issues written.
+    """
+    ckpt_file = checkpoint_path(out_file)
+    state = load_checkpoint(ckpt_file) if resume else None
+
+    if state and state.get("complete"):
+        print(f"{project_key} already complete → {out_file}")
+        return 0
+
+    if state:
+        truncate_output(out_file, state["out_offset"])
+        print(f"Resuming {project_key} at startAt={state['start_at']} "
+              f"({len(state['done_keys'])} issues already written)")
+    else:
+        state = {
+            "project": project_key,
+            "start_at": 0,
+            "last_key": None,
+            "done_keys": [],
+            "failed_keys": [],
+            "out_offset": 0,
+            "complete": False
+        }
+
+    done = set(state["done_keys"])
+    seen = set(done)
+    pending = []
+    progress = {"start_at": state["start_at"], "failed_keys": []}
+    BOARD.start(project_key, done=len(done))
+
+    def on_flush(writer):
+        done.update(pending)
+        state["start_at"] = progress["start_at"]
+        state["last_key"] = pending[-1] if pending else state["last_key"]
+        state["done_keys"] = sorted(done)
+        state["failed_keys"] = sorted(set(progress["failed_keys"]) - done)
+        state["out_offset"] = writer.tell()
+        pending.clear()
+        if index is not None:
+            index.commit()
+        save_checkpoint(ckpt_file, state)
+
+    def convert(raw):
+        if keep_raw:
+            return raw
+        with METRICS.timer("transform"):
+            return transform_issue(raw)
+
+    # raw dumps keep every field, so they can be re-transformed later
+    fields = ALL_FIELDS if keep_raw else None
+
+    def issues():
+        for key in state["failed_keys"]:
+            raw = fetch_single_issue(key, fields)
             if raw:
-                transformed = transform_issue(raw)
-                all_issues.append(transformed)
+                yield convert(raw)
+            else:
+                progress["failed_keys"].append(key)
+                BOARD.fail(project_key)
+
+        for raw in iter_raw_issues(project_key, limit=limit, start_at=state["start_at"],
+                                   skip_keys=seen, progress=progress, fields=fields):
+            yield convert(raw)
+
+    mode = "a" if state["out_offset"] else "w"
+    with JsonlWriter(out_file, mode=mode, on_flush=on_flush) as writer:
+        for obj in issues():
+            seen.add(obj["key"])
+            pending.append(obj["key"])
+            writer.write(obj)
+            if index is not None and not keep_raw:
+                index.add(obj, source=out_file)
+            BOARD.advance(project_key)
+
+    state["failed_keys"] = sorted(set(progress["failed_keys"]) - done)
+    state["complete"] = (
+        "failed_at" not in progress
+        and not state["failed_keys"]
+        and not (limit and writer.count >= limit)
+    )
+    save_checkpoint(ckpt_file, state)
+
+    if not state["complete"]:
+        print(f"{project_key} incomplete, run again with --resume to continue")
+
+    return writer.count
+
+
+# ---------------------------------------------------------
+# OFFLINE TRANSFORM STAGE
+# ---------------------------------------------------------
+# `fetch` leaves the raw REST issues in {p}_raw.jsonl; `transform` turns
+# them into {p}_dataset.jsonl without any network access. The raw file is
+# read in chunks of lines, each chunk is parsed, transformed and
+# serialized in a worker process, and the results are written in order.
+# Workers send back a histogram of their per-issue transform times, which
+# is merged into METRICS; with `profile_path` they also run under cProfile.
+
+TRANSFORM_CHUNK = 500   # raw lines per worker task
+
+
+def _transform_chunk(lines, profile_path=None):
+    out = []
+    hist = Histogram()
+    with worker_profile(profile_path):
+        for line in lines:
+            if line.strip():
+                started = time.perf_counter()
+                out.append(json.dumps(transform_issue(json.loads(line)), ensure_ascii=False) + "\n")
+                hist.observe(time.perf_counter() - started)
+    return "".join(out), len(out), hist
 
-            if limit and len(all_issues) >= limit:
-                return all_issues
 
-        start_at += PAGE_SIZE
-        if start_at >= total:
-            break
+def transform_file(raw_file, out_file, workers=None, chunk_size=TRANSFORM_CHUNK, profile_path=None):
+    """Transform a raw JSONL dump on a process pool; returns (issues, seconds)."""
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    count = 0
 
-    return all_issues
+    with open(raw_file, encoding="utf8") as src, \
+            open(out_file, "w", encoding="utf8") as dst, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = iter(lambda: list(islice(src, chunk_size)), [])
+        in_flight = deque()
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                in_flight.append(pool.submit(_transform_chunk, chunk, profile_path))
+
+        for _ in range(2 * workers):
+            submit_next()
+
+        while in_flight:
+            text, n, hist = in_flight.popleft().result()
+            submit_next()
+            dst.write(text)
+            count += n
+            METRICS.merge("transform", hist)
+
+    return count, time.monotonic() - started
+
+
+def raw_path(out_file):
+    return out_file.replace("_dataset.jsonl", "_raw.jsonl")
+
+
+def report_rate(stage, count, seconds):
+    rate = count / seconds if seconds else 0.0
+    print(f"[{stage}] {count} issues in {seconds:.1f}s ({rate:.1f} issues/s)")
+
+
+# ---------------------------------------------------------
+# INCREMENTAL SYNC
+# ---------------------------------------------------------
+# After a complete crawl, {p}_dataset.sync.json keeps the newest `updated`
+# timestamp seen in the dataset. A sync run only asks Jira for issues
+# updated since then (minus SYNC_OVERLAP_MINUTES), paging through them by
+# key (see iter_changed_pages), and upserts them by key.
+
+def sync_state_path(out_file):
+    return os.path.splitext(out_file)[0] + ".sync.json"
+
+
+def parse_jira_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def latest_updated(current, issue):
+    """The later of the `current` watermark and the issue's `updated`."""
+    updated = issue.get("updated")
+    if not updated:
+        return current
+    if current is None or parse_jira_time(updated) > parse_jira_time(current):
+        return updated
+    return current
+
+
+def dataset_watermark(out_file):
+    watermark = None
+    with open(out_file, encoding="utf8") as f:
+        for line in f:
+            if line.strip():
+                watermark = latest_updated(watermark, json.loads(line))
+    return watermark
+
+
+def jql_time(watermark, overlap_minutes=SYNC_OVERLAP_MINUTES):
+    moment = parse_jira_time(watermark) - timedelta(minutes=overlap_minutes)
+    return moment.astimezone(timezone.utc).strftime("%Y/%m/%d %H:%M")
+
+
+def upsert_jsonl(out_file, changed):
+    """
+    Rewrite `out_file` with the issues in `changed` (key → issue) swapped in.
+
+    Existing issues keep their position, new ones are appended; a missing
+    `out_file` is created. The file is streamed line by line and replaced
+    atomically.
+    """
+    remaining = dict(changed)
+    tmp = out_file + ".tmp"
+
+    with JsonlWriter(tmp) as writer:
+        if os.path.exists(out_file):
+            with open(out_file, encoding="utf8") as src:
+                for line in src:
+                    if not line.strip():
+                        continue
+                    obj = json.loads(line)
+                    writer.write(remaining.pop(obj["key"], obj))
+        for obj in remaining.values():
+            writer.write(obj)
+
+    os.replace(tmp, out_file)
+    return len(changed) - len(remaining), len(remaining)
+
+
+def sync_project(project_key, out_file, resume=False, index=None):
+    """
+    Bring `out_file` (and `index`, if given) up to date with Jira.
+
+    The first run (no sync state yet) seeds the watermark from `out_file`
+    when a complete crawl already produced it, and otherwise does a full
+    checkpointed crawl and records the watermark once that is complete.
+    Later runs only fetch issues updated since the watermark; if `out_file`
+    has gone missing since, the sync state is ignored and the project is
+    crawled in full again. Returns the number of issues written or upserted.
+    """
+    sync_file = sync_state_path(out_file)
+    state = load_checkpoint(sync_file)
+    dataset = os.path.exists(out_file)
+
+    if state is not None and not dataset:
+        # upserting into nothing would leave only the delta, looking synced
+        print(f"Sync state for {project_key} found but {out_file} is missing, crawling in full")
+        state = None
+        resume = False
+
+    if state is None and dataset:
+        ckpt = load_checkpoint(checkpoint_path(out_file))
+        watermark = dataset_watermark(out_file) if ckpt and ckpt.get("complete") else None
+        if watermark:
+            print(f"Seeding the {project_key} watermark from {out_file}: {watermark}")
+            state = {"project": project_key, "watermark": watermark}
+            save_checkpoint(sync_file, state)
+
+    if state is None:
+        count = crawl_project(project_key, out_file, resume=resume, index=index)
+        ckpt = load_checkpoint(checkpoint_path(out_file))
+        if ckpt is None or not ckpt.get("complete"):
+            return count
+
+        watermark = dataset_watermark(out_file)
+        if watermark:
+            save_checkpoint(sync_file, {"project": project_key, "watermark": watermark})
+        return count
+
+    watermark = state["watermark"]
+    changed = {}
+    progress = {}
+    BOARD.start(project_key)
+    issues = scrape_project(project_key, updated_since=jql_time(watermark), progress=progress)
+    for issue in issues:
+        changed[issue["key"]] = issue
+        watermark = latest_updated(watermark, issue)
+        BOARD.advance(project_key)
+
+    updated, added = upsert_jsonl(out_file, changed)
+    if index is not None:
+        for issue in changed.values():
+            index.add(issue, source=out_file)
+        index.commit()
+
+    # a partial delta keeps the old watermark so the next run re-reads it
+    if "failed_at" in progress or progress["failed_keys"]:
+        print(f"Sync {project_key} incomplete, watermark left at {state['watermark']}")
+        watermark = state["watermark"]
+    save_checkpoint(sync_file, {"project": project_key, "watermark": watermark})
+
+    print(f"Sync {project_key}: {updated} updated, {added} new, watermark {watermark}")
+    return len(changed)
+
+
+# ---------------------------------------------------------
+# OUTPUT
+# ---------------------------------------------------------
+
+class JsonlWriter:
+    """Buffered JSONL writer that flushes every `batch_size` issues."""
+
+    def __init__(self, path, mode="w", batch_size=WRITE_BATCH, on_flush=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.count = 0
+        self._buffer = []
+        self._file = open(path, mode, encoding="utf8")
+
+    def write(self, obj):
+        self._buffer.append(json.dumps(obj, ensure_ascii=False) + "\n")
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        with METRICS.timer("write"):
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+            self._file.flush()
+
+        if self.on_flush:
+            with METRICS.timer("checkpoint"):
+                self.on_flush(self)
+
+    def tell(self):
+        """Size of the file on disk, in bytes, after the last flush."""
+        return os.fstat(self._file.fileno()).st_size
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_parquet(out_file):
+    """Columnar copy of a finished JSONL dataset, next to it."""
+    from columnar_writer import jsonl_to_parquet   # needs pyarrow
+
+    parquet_file = os.path.splitext(out_file)[0] + ".parquet"
+    rows = jsonl_to_parquet(out_file, parquet_file, kind="rest")
+    print(f"Saved {rows} rows → {parquet_file}")
+
+
+def dedup_dataset(out_file):
+    """Drop duplicate comments from a finished dataset, in place (see dedup.py)."""
+    ckpt = load_checkpoint(checkpoint_path(out_file))
+    if ckpt is not None and not ckpt.get("complete"):
+        print(f"Skipping dedup of {out_file}: the crawl is not complete yet")
+        return None
+
+    from dedup import dedup_file
+    return dedup_file(out_file)
 
 
 # ---------------------------------------------------------
@@ -206,15 +975,122 @@ def scrape_project(project_key, limit=None):
 # ---------------------------------------------------------
 
 if __name__ == "__main__":
-    PROJECTS = ["HADOOP", "HIVE", "ZOOKEEPER"]
+    parser = argparse.ArgumentParser(description="Scrape Apache Jira projects over REST")
+    parser.add_argument("command", nargs="?", default="crawl",
+                        choices=["crawl", "fetch", "transform"],
+                        help="crawl = fetch + transform in one pass (default); "
+                             "fetch = save raw REST issues to {p}_raw.jsonl; "
+                             "transform = build {p}_dataset.jsonl from the raw dump")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for the transform command (default: all cores)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue each project from its checkpoint")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch issues updated since the last complete run")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"keep responses in {CACHE_PATH} and revalidate them")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL,
+                        help="seconds a cached response is used without revalidation")
+    parser.add_argument("--offline", action="store_true",
+                        help="rebuild datasets from the response cache only")
+    parser.add_argument("--parquet", action="store_true",
+                        help="also write {p}_dataset.parquet (needs pyarrow)")
+    parser.add_argument("--projects", default="HADOOP,HIVE,ZOOKEEPER",
+                        help="comma-separated Jira project keys")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="projects crawled at once (default: all of them)")
+    parser.add_argument("--slots", type=int, default=GLOBAL_SLOTS,
+                        help="HTTP requests in flight across all projects")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write run metrics to PATH (Prometheus text if it ends in .prom, else JSON)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="run the transform command under cProfile, stats saved to PATH")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="issues per search page (the server caps it, usually at 100)")
+    parser.add_argument("--all-fields", action="store_true",
+                        help="ask for fields=*all instead of only the fields the transform reads")
+    parser.add_argument("--dedup", action="store_true",
+                        help="drop exact and near-duplicate comments from each finished dataset")
+    parser.add_argument("--index", nargs="?", const=INDEX_PATH, metavar="PATH",
+                        help=f"also upsert every issue into a queryable SQLite index (default {INDEX_PATH}); "
+                             "query it with issue_index.py")
+    args = parser.parse_args()
 
-    for p in PROJECTS:
-        print(f"\nScraping project {p}...")
-        data = scrape_project(p, limit=None)  # remove limit to scrape full project
+    if args.cache or args.offline:
+        enable_cache(ttl=args.cache_ttl, offline=args.offline)
+
+    PROJECTS = [p.strip().upper() for p in args.projects.split(",") if p.strip()]
+    PAGE_SIZE = args.page_size
+    if args.all_fields:
+        SEARCH_FIELDS = ALL_FIELDS
+    INDEX = IssueIndex(args.index) if args.index else None
 
+    def run_project(p):
         out_file = f"{p}_dataset.jsonl"
-        with open(out_file, "w", encoding="utf8") as f:
-            for obj in data:
-                f.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
-        print(f"Saved {len(data)} transformed issues → {out_file}")
+        print(f"\nScraping project {p}...")
+        # two extra requests, only worth it before a full transforming crawl
+        if args.command == "crawl" and not args.incremental and not args.resume and not is_offline():
+            probe_field_savings(p)
+
+        started = time.monotonic()
+        if args.command == "fetch":
+            out_file = raw_path(out_file)
+            count = crawl_project(p, out_file, resume=args.resume, keep_raw=True)
+        elif args.incremental:
+            count = sync_project(p, out_file, resume=args.resume, index=INDEX)
+        else:
+            count = crawl_project(p, out_file, resume=args.resume, index=INDEX)
+
+        report_rate(f"{p} {args.command}", count, time.monotonic() - started)
+        print(f"Saved {count} issues → {out_file}")
+        if args.dedup and args.command != "fetch":
+            if dedup_dataset(out_file) and INDEX is not None:
+                INDEX.ingest_file(out_file)   # replace the indexed comments
+        if args.parquet and args.command != "fetch":
+            save_parquet(out_file)
+        return count
+
+    if args.command == "transform":
+        # CPU-bound and already spread over a process pool: one project at a time
+        for p in PROJECTS:
+            out_file = f"{p}_dataset.jsonl"
+            print(f"\nTransforming {raw_path(out_file)}...")
+            count, seconds = transform_file(raw_path(out_file), out_file, workers=args.workers,
+                                            profile_path=args.profile)
+            report_rate("transform", count, seconds)
+            print(f"Saved {count} transformed issues → {out_file}")
+            if args.dedup:
+                dedup_dataset(out_file)
+            if INDEX is not None:
+                print(f"Indexed {INDEX.ingest_file(out_file)} issues → {args.index}")
+            if args.parquet:
+                save_parquet(out_file)
+        if args.profile:
+            merge_profiles(args.profile)
+    else:
+        results = run_projects(PROJECTS, run_project, parallel=args.parallel, slots=args.slots)
+        failed = [p for p, r in results.items() if isinstance(r, Exception)]
+        if failed:
+            print(f"\nFailed projects: {', '.join(failed)}")
+
+        print(f"\nRefetches: {FETCH_STATS['refetches']}, avoided: {FETCH_STATS['refetches_avoided']}")
+        if FETCH_STATS["bytes_saved_estimate"]:
+            print(f"Field projection saved an estimated ~{FETCH_STATS['bytes_saved_estimate'] / 1024 ** 2:.1f} MB "
+                  f"of search pages (extrapolated from the probe, not measured)")
+        conn = session_stats()
+        print(f"\nHTTP requests: {conn['requests']}, handshakes: {conn['handshakes']}, reused: {conn['reused']}")
+        print(f"Rate limiter: {LIMITER.snapshot()}")
+        print(f"Request slots: {SLOTS.snapshot()}")
+        if CACHE is not None:
+            print(f"Response cache: {CACHE.snapshot()}")
+        if INDEX is not None:
+            print(f"Issue index: {INDEX.stats} → {args.index}")
+
+    if INDEX is not None:
+        INDEX.close()
+
+    print("\n" + METRICS.report())
+    if args.metrics:
+        METRICS.export(args.metrics)
+        print(f"Metrics saved → {args.metrics}")
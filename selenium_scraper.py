@@ -1,6 +1,9 @@
+import argparse
 import json
 import os
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -8,7 +11,16 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from issue_data import run_issue_extraction   # <-- Your full extractor file
+from driver_pool import DriverPool, ProcessDriverPool, POOL_BROWSERS
+from issue_data import WAIT_STATS
+from rate_limiter import LIMITER
+from checkpoint import load_checkpoint, save_checkpoint, truncate_output
+from http_cache import CACHE_PATH, CACHE_TTL
+from issue_index import INDEX_PATH, IssueIndex
+from metrics import METRICS
+from scheduler import BOARD, run_projects
+from scraper import MAX_WORKERS, enable_cache, search_issues
+from sinks import FanOutWriter, JsonArraySink, SINKS
 
 
 # ---------------------------
@@ -17,11 +29,61 @@ from issue_data import run_issue_extraction   # <-- Your full extractor file
 chrome_binary_path = r"C:\Program Files (x86)\chrome-win64\chrome-win64\chrome.exe"
 PATH = r"C:\Program Files (x86)\chromedriver.exe"
 
+ISSUE_URL = "https://issues.apache.org/jira/browse/{key}"
+KEY_PAGE_SIZE = 1000   # keys per REST search page (the server may cap it lower)
+CHECKPOINT_EVERY = 50   # issues written between checkpoints ...
+CHECKPOINT_INTERVAL = 30.0   # ... or seconds, whichever comes first
+
 
 # ----------------------------------------------------
-# Collect issue keys across ALL pagination pages
+# Collect issue keys from the REST search endpoint
 # ----------------------------------------------------
+# One request with fields=key gives the total and the server's page size;
+# every remaining page is then fetched concurrently by startAt. Keys are
+# de-duplicated and ordered by issue number, so the list is the same on
+# every run however the pages raced.
+def issue_number(key):
+    match = re.search(r"-(\d+)$", key)
+    return int(match.group(1)) if match else 0
+
+
+def collect_issue_keys_rest(project, workers=MAX_WORKERS):
+    first = search_issues(project, start_at=0, max_results=KEY_PAGE_SIZE, fields="key")
+    if first is None:
+        return None
+
+    page_size = first.get("maxResults") or KEY_PAGE_SIZE
+    offsets = range(page_size, first.get("total", 0), page_size)
+    print(f"\n{project}: {first.get('total', 0)} issues, "
+          f"{len(offsets) + 1} key pages of {page_size}")
+
+    def fetch(offset):
+        return search_issues(project, start_at=offset, max_results=page_size, fields="key")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = [first] + list(pool.map(fetch, offsets))
+
+    if any(page is None for page in pages):
+        return None
+
+    keys = {issue["key"] for page in pages for issue in page.get("issues", [])}
+    return [(key, ISSUE_URL.format(key=key)) for key in sorted(keys, key=issue_number)]
+
+
 def collect_all_issue_keys(project):
+    """Discover every (key, url) of a project; REST first, browser listing if that fails."""
+    keys = collect_issue_keys_rest(project)
+    if keys is not None:
+        return keys
+
+    print("\nREST key discovery failed, falling back to the issue navigator")
+    return collect_issue_keys_browser(project)
+
+
+# ----------------------------------------------------
+# Collect issue keys across ALL pagination pages
+# ----------------------------------------------------
+def collect_issue_keys_browser(project):
     service = Service(PATH)
     options = webdriver.ChromeOptions()
     options.binary_location = chrome_binary_path
@@ -77,8 +139,10 @@ def collect_all_issue_keys(project):
             page_num += 1
             print(f"\nClicking NEXT → Page {page_num}")
 
+            # wait for the old rows to go instead of a fixed sleep
+            first_row = driver.find_element(By.CSS_SELECTOR, "ol.issue-list li")
             driver.execute_script("arguments[0].click();", parent_link)
-            time.sleep(1)
+            wait.until(EC.staleness_of(first_row))
 
             collected.extend(extract_keys_on_page())
 
@@ -93,65 +157,233 @@ def collect_all_issue_keys(project):
 # ----------------------------------------------------
 # SCRAPE + EXTRACT DETAILS FOR EACH ISSUE
 # ----------------------------------------------------
-def scrape_full_project(project):
+# Every extracted issue is appended to output/{project}.jsonl straight
+# away, and output/{project}.checkpoint.json records the discovered keys,
+# the keys already written and the size of the JSONL at that point.
+# With resume=True the crawl skips key discovery and finished keys.
+# Issues are extracted on a DriverPool of `browsers` warm Chrome instances,
+# or with processes=True on `browsers` worker processes with one Chrome each
+# (those write issues in completion order; resume only relies on done_keys).
+# backend="http" parses the server-rendered pages on `browsers` threads
+# instead and only opens Chrome for issues whose comments need JS.
+# Each issue is serialized once and also fanned out to the `formats` sinks
+# (output/{project}.json, .jsonl.gz, ...), which only replace the real
+# files when every issue of the project was written. With an `index`
+# (IssueIndex) every issue is upserted into it too, committed along with
+# each checkpoint. The checkpoint (the whole done_keys list, fsynced) is
+# saved every CHECKPOINT_EVERY issues or CHECKPOINT_INTERVAL seconds, not
+# after every issue; a crash redoes at most that much on --resume.
+def scrape_full_project(project, resume=False, browsers=POOL_BROWSERS, processes=False,
+                        backend="selenium", formats=("json",), index=None):
     print(f"\n================== {project}: Starting Scrape ==================\n")
 
-    keys = collect_all_issue_keys(project)
-    print(f"Total issues discovered: {len(keys)}\n")
-
-    all_issue_objects = []
-
-    for i, (key, url) in enumerate(keys, start=1):
-        print(f"[{i}/{len(keys)}] Extracting → {key}")
+    os.makedirs("output", exist_ok=True)
+    out_file = f"output/{project}.jsonl"
+    ckpt_file = f"output/{project}.checkpoint.json"
+
+    state = load_checkpoint(ckpt_file) if resume else None
+
+    if state and state.get("complete"):
+        print(f"{project} already complete → {out_file}")
+        return 0
+
+    if state:
+        truncate_output(out_file, state["out_offset"])
+        keys = [tuple(k) for k in state["keys"]]
+        print(f"Resuming {project}: {len(state['done_keys'])}/{len(keys)} issues already written\n")
+    else:
+        keys = collect_all_issue_keys(project)
+        state = {
+            "project": project,
+            "keys": keys,
+            "cursor": 0,
+            "last_key": None,
+            "done_keys": [],
+            "out_offset": 0,
+            "complete": False
+        }
+        save_checkpoint(ckpt_file, state)
 
-        try:
-            issue_obj = run_issue_extraction(url)
-            all_issue_objects.append(issue_obj)
-        except Exception as e:
-            print(f"❌ Error extracting {key}: {e}")
+    print(f"Total issues discovered: {len(keys)}\n")
 
-    return all_issue_objects
+    done = set(state["done_keys"])
+    failed = 0
+    BOARD.start(project, total=len(keys), done=len(done))
+    mode = "a" if state["out_offset"] else "w"
+
+    position = {key: i for i, (key, _) in enumerate(keys, start=1)}
+    pending = [(key, url) for key, url in keys if key not in done]
+
+    if backend == "http":
+        from issue_html import HttpPool   # needs beautifulsoup4
+        pool_class = HttpPool
+    elif processes:
+        pool_class = ProcessDriverPool
+    else:
+        pool_class = DriverPool
+
+    def checkpoint(i, key):
+        with METRICS.timer("checkpoint"):
+            state["cursor"] = i
+            state["last_key"] = key
+            state["done_keys"] = sorted(done)
+            state["out_offset"] = writer.tell()
+            if index is not None:
+                index.commit()
+            save_checkpoint(ckpt_file, state)
+
+    with pool_class(size=browsers) as pool, \
+            FanOutWriter(out_file, mode=mode, formats=formats) as writer:
+        writer.replay(out_file, state["out_offset"])
+        unsaved, saved_at, last = 0, time.monotonic(), None
+
+        for key, issue_obj, error in pool.imap(pending):
+            i = position[key]
+            print(f"[{i}/{len(keys)}] Extracted → {key}")
+
+            if error is not None:
+                print(f"❌ Error extracting {key}: {error}")
+                failed += 1
+                BOARD.fail(project)
+                # worker processes report the original class name as error.kind
+                METRICS.incr(f"extract_error_{getattr(error, 'kind', type(error).__name__)}")
+                continue
+
+            with METRICS.timer("write"):
+                writer.write(issue_obj)
+                if index is not None:
+                    index.add(issue_obj, source=out_file)
+            done.add(key)
+            BOARD.advance(project)
+            METRICS.incr("issues_extracted")
+
+            unsaved, last = unsaved + 1, (i, key)
+            if unsaved >= CHECKPOINT_EVERY or time.monotonic() - saved_at >= CHECKPOINT_INTERVAL:
+                checkpoint(*last)
+                unsaved, saved_at = 0, time.monotonic()
+
+        if unsaved:
+            checkpoint(*last)
+        stats = pool.throughput()
+        # a sink with holes would look complete; --resume rebuilds it from the JSONL
+        writer.close(commit=failed == 0)
+
+    print(f"\nBrowsers: {stats['launched']} launched, {stats['recycled']} recycled, "
+          f"{stats['pages']} pages in {stats['elapsed_s']}s ({stats['pages_per_s']} pages/s)")
+    print(f"Rate limiter: {LIMITER.snapshot()}")
+    if not processes and WAIT_STATS["issues"]:   # element mode only
+        print(f"Module waits skipped: {WAIT_STATS['skipped_waits']} "
+              f"(~{WAIT_STATS['wait_saved_s']}s saved over {WAIT_STATS['issues']} issues)")
+
+    state["complete"] = failed == 0
+    save_checkpoint(ckpt_file, state)
+
+    print(f"✔ JSONL saved → {out_file}")
+    if failed:
+        print(f"\n{failed} issues failed, run again with --resume to retry them")
+        if writer.sinks:
+            print(f"Not written until then: {', '.join(sink.path for sink in writer.sinks)}")
+    else:
+        for sink in writer.sinks:
+            print(f"✔ {sink.suffix.lstrip('.')} saved → {sink.path}")
+
+    return writer.count
 
 
 # ----------------------------------------------------
-# SAVE JSON
+# SAVE JSON / JSONL (kept for callers of the old post-pass API)
 # ----------------------------------------------------
 def save_as_json(project_key, issue_objects):
     os.makedirs("output", exist_ok=True)
-    filepath = f"output/{project_key}.json"
+    sink = JsonArraySink(f"output/{project_key}")
+    for obj in issue_objects:
+        sink.write(json.dumps(obj, ensure_ascii=False), obj)
+    sink.close()
+    sink.commit()
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(issue_objects, f, indent=2, ensure_ascii=False)
+    print(f"\n✔ JSON saved → {sink.path}")
 
-    print(f"\n✔ JSON saved → {filepath}")
 
-
-# ----------------------------------------------------
-# SAVE JSONL
-# ----------------------------------------------------
 def save_as_jsonl(project_key, issue_objects):
     os.makedirs("output", exist_ok=True)
     filepath = f"output/{project_key}.jsonl"
 
-    with open(filepath, "w", encoding="utf-8") as f:
+    with FanOutWriter(filepath) as writer:
         for obj in issue_objects:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+            writer.write(obj)
 
     print(f"✔ JSONL saved → {filepath}")
 
 
 # ----------------------------------------------------
-# RUNNER — scrape ANY 3 projects
+# RUNNER — scrape the --projects list concurrently
 # ----------------------------------------------------
 if __name__ == "__main__":
-    project_list = ["ABDERA", "ACCUMULO", "AIRAVATA"]   # change these 3 if needed
-
-    for project in project_list:
+    parser = argparse.ArgumentParser(description="Scrape Apache Jira projects with Selenium")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue each project from its checkpoint")
+    parser.add_argument("--browsers", type=int, default=POOL_BROWSERS,
+                        help="warm Chrome instances, split across the projects running at once")
+    parser.add_argument("--processes", action="store_true",
+                        help="run each browser in its own worker process")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium",
+                        help="http parses server-rendered pages and only falls back to Chrome")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"keep REST and HTML responses in {CACHE_PATH}")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL,
+                        help="seconds a cached response is used without revalidation")
+    parser.add_argument("--offline", action="store_true",
+                        help="rebuild from the response cache only (implies --backend http)")
+    parser.add_argument("--formats", default="json",
+                        help=f"comma-separated extra outputs next to the JSONL: {', '.join(SINKS)}")
+    parser.add_argument("--parquet", action="store_true",
+                        help="same as adding parquet to --formats (needs pyarrow)")
+    parser.add_argument("--projects", default="ABDERA,ACCUMULO,AIRAVATA",
+                        help="comma-separated Jira project keys")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="projects scraped at once (default: all of them)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write run metrics to PATH (Prometheus text if it ends in .prom, else JSON)")
+    parser.add_argument("--index", nargs="?", const=INDEX_PATH, metavar="PATH",
+                        help=f"also upsert every issue into a queryable SQLite index (default {INDEX_PATH}); "
+                             "query it with issue_index.py")
+    args = parser.parse_args()
+
+    formats = [f for f in args.formats.split(",") if f]
+    if args.parquet and "parquet" not in formats:
+        formats.append("parquet")
+    unknown = set(formats) - set(SINKS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+
+    if args.cache or args.offline:
+        enable_cache(ttl=args.cache_ttl, offline=args.offline)
+    if args.offline:
+        args.backend = "http"
+
+    project_list = [p.strip().upper() for p in args.projects.split(",") if p.strip()]
+    parallel = min(args.parallel or len(project_list), len(project_list)) or 1
+    browsers = max(1, args.browsers // parallel)
+    index = IssueIndex(args.index) if args.index else None
+
+    def run_project(project):
         print(f"\n\n==================== SCRAPING {project} ====================\n")
-
-        data = scrape_full_project(project)
-
-        save_as_json(project, data)
-        save_as_jsonl(project, data)
-
-    print("\n\nAll 3 projects scraped successfully!")
+        return scrape_full_project(project, resume=args.resume, browsers=browsers,
+                                   processes=args.processes, backend=args.backend, formats=formats,
+                                   index=index)
+
+    results = run_projects(project_list, run_project, parallel=parallel)
+    failed = [p for p, r in results.items() if isinstance(r, Exception)]
+    if index is not None:
+        print(f"\nIssue index: {index.stats} → {args.index}")
+        index.close()
+
+    print("\n" + METRICS.report())
+    if args.metrics:
+        METRICS.export(args.metrics)
+        print(f"Metrics saved → {args.metrics}")
+
+    if failed:
+        print(f"\n\nFailed projects: {', '.join(failed)}")
+    else:
+        print(f"\n\nAll {len(project_list)} projects scraped successfully!")
@@ -0,0 +1,180 @@
+import gzip
+import json
+import os
+from abc import ABC, abstractmethod
+
+
+# ----------------------------------------------------
+# FAN-OUT OUTPUT SINKS
+# ----------------------------------------------------
+# FanOutWriter serializes every issue exactly once and hands the JSON line
+# to each configured sink as results stream in. The primary JSONL file is
+# appended to in place (it is what the crawl checkpoint points into); every
+# other sink writes to "<path>.part" and is moved over the real file with
+# os.replace only when the writer closes cleanly and the caller commits
+# (scrape_full_project does not while any issue failed), so a crash or a
+# partial run never leaves a truncated .json / .gz / .parquet behind.
+
+class Sink(ABC):
+    suffix = ""
+    needs_obj = False
+
+    def __init__(self, base):
+        self.path = base + self.suffix
+        self.part = self.path + ".part"
+
+    @abstractmethod
+    def write(self, line, obj):
+        """Append one issue, given as its JSON line and (if needs_obj) as the dict."""
+
+    def close(self):
+        self._file.close()
+
+    def commit(self):
+        os.replace(self.part, self.path)
+
+    def abort(self):
+        if os.path.exists(self.part):
+            os.remove(self.part)
+
+
+class JsonArraySink(Sink):
+    """A JSON array, one compact issue per line."""
+    suffix = ".json"
+
+    def __init__(self, base):
+        super().__init__(base)
+        self._file = open(self.part, "w", encoding="utf8")
+        self._file.write("[")
+        self._first = True
+
+    def write(self, line, obj):
+        self._file.write("\n" if self._first else ",\n")
+        self._file.write(line)
+        self._first = False
+
+    def close(self):
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+class GzipJsonlSink(Sink):
+    suffix = ".jsonl.gz"
+
+    def __init__(self, base):
+        super().__init__(base)
+        self._file = gzip.open(self.part, "wt", encoding="utf8", compresslevel=6)
+
+    def write(self, line, obj):
+        self._file.write(line + "\n")
+
+
+class ZstdJsonlSink(Sink):
+    suffix = ".jsonl.zst"
+
+    def __init__(self, base):
+        super().__init__(base)
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("jsonl.zst output needs zstandard: pip install zstandard")
+        self._raw = open(self.part, "wb")
+        self._file = zstandard.ZstdCompressor(level=6).stream_writer(self._raw)
+
+    def write(self, line, obj):
+        self._file.write((line + "\n").encode("utf-8"))
+
+    def close(self):
+        self._file.close()   # also closes the underlying file
+
+
+class ParquetSink(Sink):
+    suffix = ".parquet"
+    needs_obj = True
+
+    def __init__(self, base):
+        super().__init__(base)
+        from columnar_writer import ParquetWriter   # needs pyarrow
+        self._file = ParquetWriter(self.part, kind="selenium")
+
+    def write(self, line, obj):
+        self._file.write(obj)
+
+
+SINKS = {
+    "json": JsonArraySink,
+    "jsonl.gz": GzipJsonlSink,
+    "jsonl.zst": ZstdJsonlSink,
+    "parquet": ParquetSink,
+}
+
+
+class FanOutWriter:
+    """
+    Write each issue to `primary_path` (JSONL) and to every sink in `formats`
+    (keys of SINKS, written next to it as <base>.json, <base>.jsonl.gz, ...).
+    """
+
+    def __init__(self, primary_path, mode="w", formats=()):
+        base = os.path.splitext(primary_path)[0]
+        self.path = primary_path
+        self.count = 0
+        self._closed = False
+        self._primary = open(primary_path, mode, encoding="utf8")
+        self.sinks = []
+        try:
+            for fmt in formats:
+                self.sinks.append(SINKS[fmt](base))
+        except Exception:
+            self.close(commit=False)
+            raise
+
+    def write(self, obj):
+        line = json.dumps(obj, ensure_ascii=False)
+        self._primary.write(line + "\n")
+        for sink in self.sinks:
+            sink.write(line, obj)
+        self.count += 1
+
+    def replay(self, path, limit):
+        """Feed the first `limit` bytes of an existing JSONL into the sinks (for resumes)."""
+        if not self.sinks or not os.path.exists(path):
+            return
+
+        needs_obj = any(sink.needs_obj for sink in self.sinks)
+        with open(path, "rb") as f:
+            read = 0
+            for raw in f:
+                read += len(raw)
+                if read > limit:
+                    break
+                line = raw.decode("utf8").rstrip()
+                if not line:
+                    continue
+                obj = json.loads(line) if needs_obj else None
+                for sink in self.sinks:
+                    sink.write(line, obj)
+
+    def tell(self):
+        """Size of the primary JSONL on disk, in bytes."""
+        self._primary.flush()
+        return os.fstat(self._primary.fileno()).st_size
+
+    def close(self, commit=True):
+        """Close every file; sinks replace their real files only if `commit`. Safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        self._primary.close()
+        for sink in self.sinks:
+            sink.close()
+            if commit:
+                sink.commit()
+            else:
+                sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
@@ -0,0 +1,85 @@
+import glob
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+
+import issue_data
+from issue_data import compare_extraction_modes, run_issue_extraction
+from test_issue_html import load_expected
+
+
+# ---------------------------------------------------------
+# BATCH vs PER-ELEMENT EXTRACTION PARITY
+# ---------------------------------------------------------
+# The fixtures are issue pages saved from mock_jira.render_issue_html:
+#   MOCK-4   a few comments, labels, and a hand-added issue-links block
+#   MOCK-6   a busy issue with many comments and no labels
+#   MOCK-29  no comments
+# Each page is opened as a file:// URL and extracted in both modes, which
+# must return identical records, and batch mode must match the
+# <key>.expected.json that test_issue_html.py holds the HTTP backend to.
+# Needs Chrome; skipped when none starts.
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "*.html")))
+
+
+def start_browser():
+    try:
+        return issue_data.create_driver()
+    except Exception:
+        pass
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(options=options)
+
+
+class FixturesTest(unittest.TestCase):
+
+    def test_fixtures_found(self):
+        self.assertEqual([os.path.basename(p) for p in FIXTURES], ["MOCK-29.html", "MOCK-4.html", "MOCK-6.html"])
+
+
+class ExtractionParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.driver = start_browser()
+        except Exception as e:
+            raise unittest.SkipTest(f"no Chrome available: {e}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+
+    def test_modes_agree(self):
+        for path in FIXTURES:
+            url = "file:///" + os.path.abspath(path).replace(os.sep, "/").lstrip("/")
+            with self.subTest(fixture=os.path.basename(path)):
+                self.assertEqual(compare_extraction_modes(url, self.driver), [])
+
+    def test_batch_matches_expected(self):
+        for path in FIXTURES:
+            key = os.path.splitext(os.path.basename(path))[0]
+            url = "file:///" + os.path.abspath(path).replace(os.sep, "/").lstrip("/")
+            with self.subTest(fixture=key):
+                self.assertEqual(run_issue_extraction(url, self.driver, mode="batch"),
+                                 load_expected(key, url))
+
+    def test_fixture_content(self):
+        path = next(p for p in FIXTURES if p.endswith("MOCK-4.html"))
+        url = "file:///" + os.path.abspath(path).replace(os.sep, "/").lstrip("/")
+        issue = run_issue_extraction(url, self.driver, mode="batch")
+
+        self.assertEqual(issue["summary"]["issue_key"], "MOCK-4")
+        self.assertEqual([link["key"] for link in issue["issue_links"]], ["MOCK-1", "MOCK-2", "MOCK-3"])
+        self.assertEqual(issue["issue_links"][1]["type"], "relates to")
+        self.assertTrue(issue["comments"])
+
+
+if __name__ == "__main__":
+    unittest.main()
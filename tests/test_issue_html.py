@@ -0,0 +1,63 @@
+import glob
+import json
+import os
+import sys
+import unittest
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from issue_html import parse_issue_html
+
+
+# ---------------------------------------------------------
+# HTTP BACKEND vs BATCH-MODE OUTPUT
+# ---------------------------------------------------------
+# parse_issue_html must build the same dict as run_issue_extraction. Each
+# fixture page has a <key>.expected.json next to it holding the batch-mode
+# record, with issue-link URLs kept relative to the page (they are resolved
+# against whatever URL the page was opened from). No browser needed.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ISSUE_URL = "https://issues.apache.org/jira/browse/{key}"
+
+
+def load_expected(key, issue_url):
+    with open(os.path.join(FIXTURE_DIR, f"{key}.expected.json"), encoding="utf8") as f:
+        expected = json.load(f)
+    for link in expected["issue_links"]:
+        link["url"] = urljoin(issue_url, link["url"])
+    return expected
+
+
+class ParseIssueHtmlTest(unittest.TestCase):
+
+    def test_fixtures_match_batch_output(self):
+        paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+        self.assertTrue(paths)
+
+        for path in paths:
+            key = os.path.splitext(os.path.basename(path))[0]
+            url = ISSUE_URL.format(key=key)
+            with open(path, encoding="utf8") as f:
+                issue = parse_issue_html(f.read(), url)
+            expected = load_expected(key, url)
+
+            self.assertIsNotNone(issue, key)
+            self.assertEqual(list(issue), list(expected))
+            for section, value in expected.items():
+                if isinstance(value, dict):
+                    for field, field_value in value.items():
+                        with self.subTest(fixture=key, field=f"{section}.{field}"):
+                            self.assertEqual(issue[section][field], field_value)
+                else:
+                    with self.subTest(fixture=key, field=section):
+                        self.assertEqual(issue[section], value)
+
+    def test_page_without_issue_details(self):
+        self.assertIsNone(parse_issue_html("<html><body>Maintenance</body></html>",
+                                           ISSUE_URL.format(key="MOCK-1")))
+
+
+if __name__ == "__main__":
+    unittest.main()
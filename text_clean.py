@@ -0,0 +1,140 @@
+import re
+import timeit
+
+
+# ---------------------------------------------------------
+# TEXT CLEANING FOR THE LLM DATASET
+# ---------------------------------------------------------
+# clean_text used to run two re.sub passes (strip tags, then collapse
+# whitespace) over every field and comment. Now whitespace is collapsed by
+# str.split/join, a single C-level pass, and one precompiled alternation
+# handles all markup in a single re.sub, only when the text contains a
+# "<", "{" or "[" at all:
+#   {code}...{code}, {noformat}...{noformat}   markers dropped, body kept verbatim
+#   <tags>, {quote}, {panel}, {color}          dropped (what they enclose is kept)
+#   [text|http://...]                          text
+#   [~username]                                username
+#   [http://...]                               http://...
+# Any other brackets ([INFO], arr[0], map[key]) are left alone.
+
+_MARKUP = re.compile(
+    r"\{(?P<block>code|noformat)(?::[^}]*)?\}(?P<code>.*?)\{(?P=block)\}"
+    r"|<[^>]+>"
+    r"|\{(?:code|noformat|quote|panel|color)(?::[^}]*)?\}"
+    r"|\[(?P<text>[^|\[\]\n]+)\|[^\s|\[\]]+\]"
+    r"|\[~(?P<user>[^\s\[\]]+)\]"
+    r"|\[(?P<url>(?:https?|ftp|file|mailto):[^\s\[\]]*)\]",
+    re.DOTALL
+)
+_SENTENCE_END = re.compile(r"[.!?]")
+
+
+def _rewrite(m):
+    group = m.lastgroup   # None for tags and block markers
+    if group is None:
+        return " "
+    if group == "code":
+        return f" {m['code']} "
+    return m[group]
+
+
+def clean_text(x):
+    if not x:
+        return ""
+    if "<" in x or "{" in x or "[" in x:
+        x = _MARKUP.sub(_rewrite, x)
+    return " ".join(x.split())
+
+
+def first_sentence(text):
+    """Text up to the first . ! or ?, found without splitting the rest."""
+    m = _SENTENCE_END.search(text)
+    return text[:m.start()] if m else text
+
+
+def text_head(parts, max_len):
+    """
+    The start of "".join(parts).strip(), long enough for summarize(..., max_len).
+
+    Pieces are only joined until more than max_len non-blank characters are
+    collected, so issues with hundreds of comments are not concatenated in
+    full just to keep the first few hundred characters.
+    """
+    head = []
+    size = 0
+    for part in parts:
+        if not head:
+            part = part.lstrip()
+            if not part:
+                continue
+        head.append(part)
+        size += len(part)
+        if size > max_len and len("".join(head).rstrip()) > max_len:
+            break
+    return "".join(head).rstrip()
+
+
+# ---------------------------------------------------------
+# MICROBENCHMARK AGAINST THE PREVIOUS IMPLEMENTATION
+# ---------------------------------------------------------
+
+def legacy_clean_text(x):
+    if not x:
+        return ""
+    x = re.sub(r"<[^>]+>", " ", x)
+    x = re.sub(r"\s+", " ", x)
+    return x.strip()
+
+
+def legacy_first_sentence(text):
+    return re.split(r"[.!?]", text)[0]
+
+
+def sample_comment(i, wiki=True):
+    if not wiki:
+        return f"<p>Comment {i}: the   build failed on <b>trunk</b>\n\nsee HADOOP-{i} thanks.</p>\n" * 4
+
+    return (
+        f"<p>Comment {i}: the   build failed on <b>trunk</b>\n\n"
+        "{code:java}\nint x = arr[i];\n{code}\n"
+        f"see [HADOOP-{i}|https://issues.apache.org/jira/browse/HADOOP-{i}] "
+        "and ping [~someone]   thanks.</p>\n" * 4
+    )
+
+
+def run_benchmark(comments=300, repeat=5):
+    bodies = [sample_comment(i) for i in range(comments)]
+    plain = [sample_comment(i, wiki=False) for i in range(comments)]
+    description = " ".join(bodies[:20])
+
+    def iter_blob():
+        yield from ("title", "\n\n", description, "\n\n")
+        for i, body in enumerate(bodies):
+            if i:
+                yield " "
+            yield body
+
+    cases = [
+        ("clean_text (HTML comments)",
+         lambda: [legacy_clean_text(b) for b in plain],
+         lambda: [clean_text(b) for b in plain]),
+        ("clean_text (wiki comments)",
+         lambda: [legacy_clean_text(b) for b in bodies],
+         lambda: [clean_text(b) for b in bodies]),
+        ("first sentence",
+         lambda: legacy_first_sentence(description),
+         lambda: first_sentence(description)),
+        ("summary blob",
+         lambda: ("title\n\n" + description + "\n\n" + " ".join(bodies)).strip(),
+         lambda: text_head(iter_blob(), 300)),
+    ]
+
+    for name, old, new in cases:
+        t_old = min(timeit.repeat(old, number=10, repeat=repeat))
+        t_new = min(timeit.repeat(new, number=10, repeat=repeat))
+        print(f"{name:<28} old {t_old * 100:8.2f} ms   new {t_new * 100:8.2f} ms   "
+              f"x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()